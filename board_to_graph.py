@@ -1,6 +1,8 @@
 import argparse
 from simsnn.core.networks import Network
 from simsnn.core.simulators import Simulator
+from simsnn.core.detectors import FirstSpike, SynapseProbe
+from simsnn.core.engines import create_engine
 import numpy as np
 
 def make_base_connections(nr_cells, nr_dice_sides):
@@ -63,7 +65,7 @@ def add_snakes(connections, snake_starts, snake_ends):
             modified_connections.append(con)
     return modified_connections
 
-def connections_to_graph(nr_cells, nr_dice_sides, connections, net, sim):
+def connections_to_graph(nr_cells, nr_dice_sides, connections, net, sim, readouts=True):
     """
     Converts the board connections into a neural network graph.
 
@@ -73,9 +75,14 @@ def connections_to_graph(nr_cells, nr_dice_sides, connections, net, sim):
         connections (list): List of connections on the board.
         net (object): Neural network object to create neurons and synapses.
         sim (object): Simulation object to add raster targets.
+        readouts (bool): Whether to create the read-out neurons and record everything in the raster. Without
+            read-outs only the board neurons are created, and only the final board neuron is added to the raster
+            (so that the simulation stops when the goal is reached). The synapses between board neurons are
+            always labelled with (start, post, throw, kind) as their meta, where kind is "move", "ladder" or
+            "snake", so that a SynapseProbe can replace the read-outs.
 
     Returns:
-        None
+        list: The board neurons, indexed by cell.
     """
     board_neurons = []
     read_neurons = []
@@ -85,6 +92,8 @@ def connections_to_graph(nr_cells, nr_dice_sides, connections, net, sim):
         # Adding a neuron for each square on the board
         neuron = net.createLIF(ID=f"B{c+1}", thr=nr_cells * nr_dice_sides + 1, V_reset=0, m=1, V_init=nr_cells * nr_dice_sides)
         board_neurons.append(neuron)
+        if not readouts:
+            continue
         for d in range(nr_dice_sides):
             # Adding read-out neurons to track what throw was used to get there
             read_neuron = net.createLIF(ID=f"R{c+1}-D{d+1}", thr=nr_cells * nr_dice_sides + 1, V_reset=0, m=1, V_init=nr_cells * nr_dice_sides)
@@ -95,8 +104,18 @@ def connections_to_graph(nr_cells, nr_dice_sides, connections, net, sim):
     snake_read_neurons = []
     for c in connections:
         (start_neuron, post_neuron, throw) = c
-        # Synapse between board neurons
-        net.createSynapse(pre=board_neurons[start_neuron], post=board_neurons[post_neuron], ID=f"s{start_neuron}, p{post_neuron}, d{throw}", w=1, d=1)
+        synapse_id = f"s{start_neuron}, p{post_neuron}, d{throw}"
+        if post_neuron - start_neuron > throw:
+            kind = "ladder"
+        elif post_neuron - start_neuron < throw:
+            kind = "snake"
+        else:
+            kind = "move"
+        # Synapse between board neurons, labelled with the move it represents
+        net.createSynapse(pre=board_neurons[start_neuron], post=board_neurons[post_neuron], ID=synapse_id, w=1, d=1,
+                          meta=(start_neuron, post_neuron, throw, kind))
+        if not readouts:
+            continue
 
         # Synapse between board neurons and read-out neurons
         read_index = (post_neuron - 1) * nr_dice_sides + (throw - 1)
@@ -107,19 +126,484 @@ def connections_to_graph(nr_cells, nr_dice_sides, connections, net, sim):
             if post_neuron - start_neuron > throw:
                 ladder_read_neuron = net.createLIF(ID=f"L{post_neuron}-D{throw}", thr=nr_cells * nr_dice_sides + 1, V_reset=0, m=1, V_init=nr_cells * nr_dice_sides)
                 ladder_read_neurons.append(ladder_read_neuron)
-                net.createSynapse(pre=board_neurons[start_neuron], post=ladder_read_neuron, ID=f"s{start_neuron}, p{post_neuron}, d{throw}", w=1, d=1)
+                net.createSynapse(pre=board_neurons[start_neuron], post=ladder_read_neuron, ID=synapse_id, w=1, d=1)
             # If snake
             elif post_neuron - start_neuron < throw:
                 snake_read_neuron = net.createLIF(ID=f"S{post_neuron}-D{throw}", thr=nr_cells * nr_dice_sides + 1, V_reset=0, m=1, V_init=nr_cells * nr_dice_sides)
                 snake_read_neurons.append(snake_read_neuron)
-                net.createSynapse(pre=board_neurons[start_neuron], post=snake_read_neuron, ID=f"s{start_neuron}, p{post_neuron}, d{throw}", w=1, d=1)
+                net.createSynapse(pre=board_neurons[start_neuron], post=snake_read_neuron, ID=synapse_id, w=1, d=1)
         else:
-            net.createSynapse(pre=board_neurons[start_neuron], post=read_neurons[read_index], ID=f"s{start_neuron}, p{post_neuron}, d{throw}", w=1, d=1)
+            net.createSynapse(pre=board_neurons[start_neuron], post=read_neurons[read_index], ID=synapse_id, w=1, d=1)
+
+    if not readouts:
+        sim.raster.addTarget(board_neurons[-1])
+        return board_neurons
 
     sim.raster.addTarget(read_neurons)
     sim.raster.addTarget(ladder_read_neurons)
     sim.raster.addTarget(snake_read_neurons)
     sim.raster.addTarget(board_neurons)
+    return board_neurons
+
+
+def reverse_connections(connections):
+    """
+    Reverses the direction of all connections on the board.
+
+    Args:
+        connections (list): List of connections on the board.
+
+    Returns:
+        list: The reversed connections in the form (end_cell, start_cell, dice_roll).
+    """
+    return [(post, start, throw) for (start, post, throw) in connections]
+
+def reversed_connections_to_graph(nr_cells, nr_dice_sides, connections, net, sim):
+    """
+    Converts the reversed board connections into a neural network graph that is driven from the final cell.
+
+    Every board neuron spikes exactly once, at the time step that equals its distance to the final cell.
+
+    Args:
+        nr_cells (int): Number of cells on the board.
+        nr_dice_sides (int): Number of sides on the dice.
+        connections (list): List of (forward) connections on the board.
+        net (object): Neural network object to create neurons and synapses.
+        sim (object): Simulation object to add raster targets.
+
+    Returns:
+        list: The board neurons, indexed by cell.
+    """
+    board_neurons = []
+    for c in range(nr_cells):
+        # Adding a neuron for each square on the board, except for the goal
+        neuron = net.createLIF(ID=f"B{c}", thr=nr_cells * nr_dice_sides + 1, V_reset=0, m=1, V_init=nr_cells * nr_dice_sides)
+        board_neurons.append(neuron)
+    goal_neuron = net.createInputTrain(train=[1], loop=False, ID=f"B{nr_cells}")
+    board_neurons.append(goal_neuron)
+
+    for (start_neuron, post_neuron, throw) in reverse_connections(connections):
+        net.createSynapse(pre=board_neurons[start_neuron], post=board_neurons[post_neuron], ID=f"s{start_neuron}, p{post_neuron}, d{throw}", w=1, d=1)
+
+    sim.raster.addTarget(board_neurons)
+    return board_neurons
+
+def get_distances_to_goal(nr_cells, nr_dice_sides, connections):
+    """
+    Function that finds the distance to the goal from every cell with a single simulation of the reversed board.
+    - nr_cells: number of cells on the board.
+    - nr_dice_sides: number of sides on the dice.
+    - connections: the connections on the board, as returned by add_snakes.
+    Returns:
+    - an array with the minimal number of throws to reach the goal from every
+      cell, or -1 for cells from which the goal cannot be reached (including
+      the starts of ladders and snakes, on which a player never stays).
+    - a dictionary with, for every cell, the dice throws that lie on a
+      shortest path to the goal.
+    """
+    net = Network()
+    sim = Simulator(net)
+    reversed_connections_to_graph(nr_cells, nr_dice_sides, connections, net, sim)
+
+    # The goal spikes at t=0, a cell at distance k spikes at t=k
+    sim.run(nr_cells + 1, early_stop=False)
+    raster = sim.get_raster_data()
+    distances = np.where(raster.any(axis=0), raster.argmax(axis=0), -1)
+
+    optimal_throws = {cell: [] for cell in range(nr_cells + 1)}
+    for (start, post, throw) in connections:
+        if distances[start] > 0 and distances[post] == distances[start] - 1:
+            optimal_throws[start].append(throw)
+    for throws in optimal_throws.values():
+        throws.sort()
+
+    return distances, optimal_throws
+
+
+def connections_to_transition_table(nr_cells, nr_dice_sides, connections):
+    """
+    Compiles the board connections into a lookup table of moves.
+
+    Args:
+        nr_cells (int): Number of cells on the board.
+        nr_dice_sides (int): Number of sides on the dice.
+        connections (list): List of connections on the board.
+
+    Returns:
+        np.ndarray: Array of shape (nr_cells + 1, nr_dice_sides), where entry [cell, throw - 1] is the cell
+        that is reached by that throw. Throws that overshoot the final cell leave the token in place.
+    """
+    table = np.repeat(np.arange(nr_cells + 1)[:, None], nr_dice_sides, axis=1)
+    for (start, post, throw) in connections:
+        table[start, throw - 1] = post
+    return table
+
+def simulate_random_games(nr_cells, nr_dice_sides, connections, nr_games, seed=None, chunk_size=100000,
+                          max_throws=10000, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+    """
+    Function that plays many random games at once, to find the distribution of game lengths.
+    - nr_cells: number of cells on the board.
+    - nr_dice_sides: number of sides on the dice.
+    - connections: the connections on the board, as returned by add_snakes.
+    - nr_games: the number of independent games to play.
+    - seed: seed of the random generator; the same seed and chunk size give the same results.
+    - chunk_size: the number of games that are played simultaneously, which bounds the memory use.
+    - max_throws: games that have not reached the final cell after this many throws are not finished.
+    - quantiles: the quantiles of the game length to report.
+    Returns:
+    - a dictionary with the histogram of game lengths (the number of games that
+      finished after each number of throws), the mean game length, the
+      requested quantiles and the number of unfinished games.
+    """
+    table = connections_to_transition_table(nr_cells, nr_dice_sides, connections)
+    rng = np.random.default_rng(seed)
+    histogram = np.zeros(max_throws + 1, dtype=np.int64)
+
+    for chunk_start in range(0, nr_games, chunk_size):
+        # Only the games that are still running are kept, so every throw costs time proportional to those games
+        positions = np.zeros(min(chunk_size, nr_games - chunk_start), dtype=table.dtype)
+        for throw in range(1, max_throws + 1):
+            positions = table[positions, rng.integers(0, nr_dice_sides, size=positions.size)]
+            finished = positions == nr_cells
+            histogram[throw] += np.count_nonzero(finished)
+            positions = positions[~finished]
+            if positions.size == 0:
+                break
+
+    nr_finished = histogram.sum()
+    lengths = np.arange(max_throws + 1)
+    results = {
+        "histogram": histogram[:lengths[histogram > 0].max() + 1] if nr_finished else histogram[:1],
+        "mean": float((lengths * histogram).sum() / nr_finished) if nr_finished else float("nan"),
+        "quantiles": {},
+        "unfinished": int(nr_games - nr_finished),
+    }
+    cumulative = np.cumsum(histogram)
+    for q in quantiles:
+        results["quantiles"][q] = int(np.searchsorted(cumulative, q * nr_finished)) if nr_finished else None
+    return results
+
+
+def moves_to_log(moves, final_node):
+    """
+    Describes a path over the board in words.
+    - moves: a list of moves in the form (start_cell, end_cell, dice_roll).
+    - final_node: the final space of the board.
+    Returns:
+    - a list with the log.
+    """
+    log = []
+    for (start, post, throw) in moves:
+        if start != 0:
+            log.append(f"You are now on space {start}.")
+        else:
+            log.append("You start on space 0.")
+        log.append(f"You throw a {throw}.")
+        if post - start > throw:
+            log.append(f"Now, you are on {start + throw}, take a ladder from here.")
+        elif post - start < throw:
+            log.append(f"Now, you are on {start + throw}, take a snake from here.")
+    log.append(f"You reached the finish by reaching final space {final_node}.")
+    return log
+
+
+def backtrack_paths(final_node, incoming, all_paths=True):
+    """
+    Function that enumerates the paths from cell 0 to the final cell by walking back over the moves into every cell.
+    The walk is a depth-first search with an explicit stack, so paths of any length can be followed.
+    - final_node: the final space of the board.
+    - incoming: a function that returns the moves (start_cell, end_cell, dice_roll) into a cell that lie on a shortest
+      path, in the order in which they are followed.
+    - all_paths: whether to find all paths or just the first one.
+    Returns:
+    - a list of lists with the dice throws.
+    - a list of lists with the log.
+    """
+    dice_throws_list = []
+    logs = []
+    # Every entry holds a cell and the moves from it to the final cell, as a linked list (move, rest)
+    stack = [(final_node, None)]
+    while stack:
+        node, path = stack.pop()
+        if node == 0:
+            moves = []
+            while path is not None:
+                move, path = path
+                moves.append(move)
+            dice_throws_list.append([throw for (_, _, throw) in moves])
+            logs.append(moves_to_log(moves, final_node))
+            if not all_paths:
+                break
+            continue
+        stack.extend((move[0], (move, path)) for move in reversed(incoming(node)))
+    return dice_throws_list, logs
+
+
+def get_shortest_paths_from_first_spikes(first_spikes, connections, all_paths=True):
+    """
+    Function that finds the shortest path(s) by following the recorded predecessors of the board neurons.
+    - first_spikes: a FirstSpike detector that recorded the board neurons (in
+      order of their cell) with predecessors.
+    - connections: the connections on the board, as returned by add_snakes.
+    - all_paths: whether to find all shortest paths or just one.
+    Returns:
+    - a list of lists with the dice throws.
+    - a list of lists with the log.
+    """
+    cells = {id(neuron): cell for cell, neuron in enumerate(first_spikes.targets)}
+    triggers = first_spikes.get_predecessors()
+    final_node = len(first_spikes.targets) - 1
+    if first_spikes.get_measurements()[final_node] < 0:
+        return [], []
+
+    # Throws that move a player from one cell to another
+    throws = dict()
+    for (start, post, throw) in connections:
+        throws.setdefault((start, post), []).append(throw)
+
+    def incoming(node):
+        # Parallel synapses from the same cell (different throws) are visited once
+        starts = dict.fromkeys(cells[id(synapse.pre)] for synapse in triggers[node])
+        return [(start, node, throw) for start in starts for throw in sorted(throws[(start, node)])]
+
+    return backtrack_paths(final_node, incoming, all_paths)
+
+
+def get_shortest_paths_from_synapse_events(events, final_node, all_paths=True):
+    """
+    Function that finds the shortest path(s) from the synapse events of a board network without read-out neurons.
+    - events: the (step, synapse) events of a SynapseProbe, where the board synapses carry (start, post, throw, kind)
+      as their meta (see connections_to_graph).
+    - final_node: the goal cell.
+    - all_paths: whether to find all shortest paths or just one.
+    Returns:
+    - a list of lists with the dice throws.
+    - a list of lists with the log.
+    """
+    # Every board neuron spikes once, one step (the delay) after its first input arrived
+    arrival = {0: 0}
+    moves = [(t, s) for (t, s) in events if getattr(s, "meta", None) is not None]
+    for (t, synapse) in moves:
+        post = synapse.meta[1]
+        arrival[post] = min(arrival.get(post, t + synapse.d), t + synapse.d)
+    if final_node not in arrival:
+        return [], []
+
+    # The moves that are part of a shortest path: they leave a cell when it spikes and arrive first
+    incoming = dict()
+    for (t, synapse) in moves:
+        start, post, throw, _ = synapse.meta
+        if arrival.get(start) == t and t + synapse.d == arrival[post]:
+            incoming.setdefault(post, []).append((start, post, throw))
+
+    def moves_into(node):
+        return sorted(incoming.get(node, []), key=lambda move: (move[2], move[0]))
+
+    return backtrack_paths(final_node, moves_into, all_paths)
+
+
+def get_shortest_paths_bidirectional(nr_cells, nr_dice_sides, connections, all_paths=True, engine="object"):
+    """
+    Function that finds the shortest path(s) by simulating the board from the start and the reversed board from the
+    final cell in lockstep, and stopping as soon as their wavefronts meet in a common cell.
+    - nr_cells: number of cells on the board.
+    - nr_dice_sides: number of sides on the dice.
+    - connections: the connections on the board, as returned by add_snakes.
+    - all_paths: whether to find all shortest paths or just one.
+    - engine: the engine that runs both networks (see Simulator).
+    Returns:
+    - a list of lists with the dice throws.
+    - a list of lists with the log.
+    """
+    forward_net, backward_net = Network(), Network()
+    forward_sim, backward_sim = Simulator(forward_net, engine=engine), Simulator(backward_net, engine=engine)
+    forward_neurons = connections_to_graph(nr_cells, nr_dice_sides, connections, forward_net, forward_sim,
+                                           readouts=False)
+    backward_neurons = reversed_connections_to_graph(nr_cells, nr_dice_sides, connections, backward_net, backward_sim)
+    halves = []
+    for sim, neurons in ((forward_sim, forward_neurons), (backward_sim, backward_neurons)):
+        first_spikes = FirstSpike(neurons)
+        first_spikes.bind(sim.compile())
+        first_spikes.initialize(0)
+        halves.append((sim.compile(), first_spikes))
+    from_start = halves[0][1].get_measurements()
+    to_goal = halves[1][1].get_measurements()
+
+    # A cell spikes at its distance from the start (forward) or to the goal (backward). A shortest path of length L
+    # has a cell that both halves reach within ceil(L / 2) ticks, and L is at most nr_cells. At the first tick T at
+    # which some cell is known to both halves, L is the smallest sum of its two distances over those cells.
+    length = None
+    for tick in range((nr_cells + 1) // 2 + 1):
+        for engine, first_spikes in halves:
+            engine.step()
+            first_spikes.step()
+        known = (from_start >= 0) & (to_goal >= 0)
+        if known.any():
+            length = int((from_start + to_goal)[known].min())
+            break
+    if length is None:
+        return [], []
+
+    # Every shortest path passes exactly one cell at distance L - T from the start, and both halves know the
+    # distances of all cells before and after it, so the paths are stitched together at that layer.
+    layer = length - tick
+    into, out_of = dict(), dict()
+    for move in sorted(connections, key=lambda move: (move[2], move[0])):
+        (start, post, _) = move
+        if 0 <= from_start[start] < layer and from_start[post] == from_start[start] + 1:
+            into.setdefault(post, []).append(move)
+        if 0 <= to_goal[post] < length - layer and to_goal[start] == to_goal[post] + 1:
+            out_of.setdefault(start, []).append(move)
+
+    def walk(cell, end, moves, forward):
+        # Depth-first over the moves with an explicit stack, so that paths of any length can be followed
+        stack = [(cell, None)]
+        while stack:
+            node, path = stack.pop()
+            if node == end:
+                found = []
+                while path is not None:
+                    move, path = path
+                    found.append(move)
+                yield found[::-1] if forward else found
+                continue
+            stack.extend((move[1] if forward else move[0], (move, path)) for move in reversed(moves.get(node, [])))
+
+    dice_throws_list = []
+    logs = []
+    meeting_cells = np.flatnonzero((from_start == layer) & (to_goal == length - layer))
+    for cell in meeting_cells:
+        for prefix in walk(cell, 0, into, forward=False):
+            for suffix in walk(cell, nr_cells, out_of, forward=True):
+                path = prefix + suffix
+                dice_throws_list.append([throw for (_, _, throw) in path])
+                logs.append(moves_to_log(path, nr_cells))
+                if not all_paths:
+                    return dice_throws_list, logs
+    return dice_throws_list, logs
+
+
+class BoardTemplate:
+    """
+    The board network of one board shape, built once and reused for every placement of snakes and ladders.
+
+    The board neurons and the synapses of the base connections (see make_base_connections) are compiled into an
+    array engine once. A board is instantiated by forking that engine, which shares the compiled synapses and starts
+    from the initial neuron state, and by editing only the moves that snakes and ladders change: the moves onto or
+    from their starts. Apart from copying the state arrays, a board therefore costs time in the number of snakes and
+    ladders instead of the size of the board. Use get_board_template to reuse templates.
+
+    Args:
+        nr_cells (int): Number of cells on the board.
+        nr_dice_sides (int): Number of sides on the dice.
+        engine (str): Array engine that runs the boards (see Simulator).
+    """
+
+    def __init__(self, nr_cells, nr_dice_sides, engine="integer"):
+        self.nr_cells = nr_cells
+        self.nr_dice_sides = nr_dice_sides
+        self.network = Network()
+        self.neurons = connections_to_graph(nr_cells, nr_dice_sides, make_base_connections(nr_cells, nr_dice_sides),
+                                            self.network, Simulator(self.network), readouts=False)
+        self.engine = create_engine(engine, self.network)
+        if self.engine.indices([]) is None:
+            raise ValueError("A board template needs an engine that keeps its state in arrays")
+        # Edge id of every base move; the edge ids follow the synapses of the network
+        self.edges = {synapse.meta[:3]: edge for edge, synapse in enumerate(self.network.synapses)}
+
+    def jump_edits(self, ladder_starts, ladder_ends, snake_starts, snake_ends):
+        """
+        Finds the base moves that snakes and ladders change, and the moves that replace them.
+
+        Only the moves onto or from the start of a snake or ladder change, so add_ladders and add_snakes are
+        applied to those moves alone.
+
+        Returns:
+            list: The base moves that are removed, as (start_cell, end_cell, dice_roll).
+            list: The moves that are added instead.
+        """
+        affected = dict()
+        for cell in list(ladder_starts) + list(snake_starts):
+            for throw in range(1, self.nr_dice_sides + 1):
+                for (start, post) in ((cell - throw, cell), (cell, cell + throw)):
+                    if start >= 0 and post <= self.nr_cells:
+                        affected[(start, post, throw)] = None
+        affected = list(affected)
+        replaced = add_snakes(add_ladders(affected, ladder_starts, ladder_ends), snake_starts, snake_ends)
+        unchanged = set(affected) & set(replaced)
+        removed = [move for move in affected if move not in unchanged]
+        added = [move for move in replaced if move not in unchanged]
+        return removed, added
+
+    def instantiate(self, ladder_starts, ladder_ends, snake_starts, snake_ends):
+        """
+        Creates the network of a board as a fork of the compiled template.
+
+        Returns:
+            engine: A fresh engine for the board, in which B0 spikes in the first step.
+            list: The base moves that were removed.
+            list: The moves that were added.
+        """
+        removed, added = self.jump_edits(ladder_starts, ladder_ends, snake_starts, snake_ends)
+        engine = self.engine.fork()
+        # The edits are few, so the compiled synapses are kept and the edits stay in the overlay
+        engine.compaction = float("inf")
+        for move in removed:
+            engine.remove_synapse(self.edges[move])
+        for (start, post, _) in added:
+            engine.add_synapse(self.neurons[start], self.neurons[post])
+        return engine, removed, added
+
+    def get_shortest_paths(self, ladder_starts, ladder_ends, snake_starts, snake_ends, all_paths=True):
+        """
+        Function that finds the shortest path(s) on a board with this shape, from the first spike times.
+        - ladder_starts, ladder_ends, snake_starts, snake_ends: the snakes and ladders, as for add_ladders and
+          add_snakes.
+        - all_paths: whether to find all shortest paths or just one.
+        Returns:
+        - a list of lists with the dice throws.
+        - a list of lists with the log.
+        """
+        engine, removed, added = self.instantiate(ladder_starts, ladder_ends, snake_starts, snake_ends)
+        first_spikes = FirstSpike(self.neurons)
+        first_spikes.bind(engine)
+        first_spikes.initialize(0)
+        times = first_spikes.get_measurements()
+        final_node = self.nr_cells
+        for _ in range(self.nr_cells + 1):
+            engine.step()
+            first_spikes.step()
+            if times[final_node] >= 0:
+                break
+        else:
+            return [], []
+
+        removed = set(removed)
+        added_into = dict()
+        for move in added:
+            added_into.setdefault(move[1], []).append(move)
+
+        def incoming(cell):
+            moves = [(cell - throw, cell, throw) for throw in range(1, self.nr_dice_sides + 1) if cell - throw >= 0]
+            moves = [move for move in moves if move not in removed] + added_into.get(cell, [])
+            # A move is on a shortest path when the start spiked one step before the cell
+            moves = [move for move in moves if times[move[0]] >= 0 and times[move[0]] + 1 == times[cell]]
+            return sorted(moves, key=lambda move: (move[2], move[0]))
+
+        return backtrack_paths(final_node, incoming, all_paths)
+
+
+_board_templates = dict()
+
+
+def get_board_template(nr_cells, nr_dice_sides, engine="integer"):
+    """
+    Returns the BoardTemplate of a board shape, which is built on first use and cached.
+    """
+    key = (nr_cells, nr_dice_sides, engine)
+    if key not in _board_templates:
+        _board_templates[key] = BoardTemplate(nr_cells, nr_dice_sides, engine)
+    return _board_templates[key]
 
 
 def get_shortest_path(sim, ladder_starts, ladder_ends, snake_starts, snake_ends):
@@ -339,6 +823,13 @@ if __name__ == "__main__":
     parser.add_argument('--snake_ends', type=list_of_ints, default=[])
     parser.add_argument('--ladder_starts', type=list_of_ints, default=[2])
     parser.add_argument('--ladder_ends', type=list_of_ints, default=[6])
+    parser.add_argument('--all_distances', action='store_true', help='Print the distance to the goal from every cell')
+    parser.add_argument('--monte_carlo', type=int, default=0, help='Number of random games to play')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--first_spike', action='store_true', help='Record only the first spike of every board neuron')
+    parser.add_argument('--probe', action='store_true', help='Build only board neurons and read the moves from the synapses')
+    parser.add_argument('--bidirectional', action='store_true', help='Search from the start and from the goal at once')
+    parser.add_argument('--template', action='store_true', help='Instantiate the board from a cached template of its shape')
     args = parser.parse_args()
 
     # Create the network and the simulator object
@@ -348,7 +839,64 @@ if __name__ == "__main__":
     base_connections = make_base_connections(args.nr_cells, args.nr_dice_sides)
     connections = add_ladders(base_connections, args.ladder_starts, args.ladder_ends)
     final_connections = add_snakes(connections, args.snake_starts, args.snake_ends)
+
+    if args.all_distances:
+        distances, optimal_throws = get_distances_to_goal(args.nr_cells, args.nr_dice_sides, final_connections)
+        for cell, distance in enumerate(distances):
+            if distance < 0:
+                print(f"Space {cell}: goal cannot be reached.")
+            else:
+                print(f"Space {cell}: {distance} throw(s) to the goal, best throws: {optimal_throws[cell]}")
+        raise SystemExit
+
+    if args.monte_carlo:
+        results = simulate_random_games(args.nr_cells, args.nr_dice_sides, final_connections, args.monte_carlo, seed=args.seed)
+        print(f"Mean game length: {results['mean']:.2f} throws")
+        for q, length in results["quantiles"].items():
+            print(f"{int(q * 100)}% of the games finish within {length} throws")
+        if results["unfinished"]:
+            print(f"{results['unfinished']} games did not finish")
+        raise SystemExit
+
+    if args.first_spike:
+        board_neurons = connections_to_graph(args.nr_cells, args.nr_dice_sides, final_connections, net, sim, readouts=False)
+        first_spikes = sim.addDetector(FirstSpike(board_neurons, predecessors=True))
+        sim.run(args.nr_cells, plotting=False)
+        dice_throws, log = get_shortest_paths_from_first_spikes(first_spikes, final_connections)
+        print("Dice throws:", dice_throws, end="\n\n")
+        for info in log:
+            print(info)
+        raise SystemExit
+
+    if args.probe:
+        connections_to_graph(args.nr_cells, args.nr_dice_sides, final_connections, net, sim, readouts=False)
+        probe = sim.addDetector(SynapseProbe())
+        sim.optimize()
+        sim.run(args.nr_cells, plotting=False)
+        dice_throws, log = get_shortest_paths_from_synapse_events(probe.get_measurements(), args.nr_cells)
+        print("Dice throws:", dice_throws, end="\n\n")
+        for info in log:
+            print(info)
+        raise SystemExit
+
+    if args.template:
+        template = get_board_template(args.nr_cells, args.nr_dice_sides)
+        dice_throws, log = template.get_shortest_paths(args.ladder_starts, args.ladder_ends, args.snake_starts, args.snake_ends)
+        print("Dice throws:", dice_throws, end="\n\n")
+        for info in log:
+            print(info)
+        raise SystemExit
+
+    if args.bidirectional:
+        dice_throws, log = get_shortest_paths_bidirectional(args.nr_cells, args.nr_dice_sides, final_connections)
+        print("Dice throws:", dice_throws, end="\n\n")
+        for info in log:
+            print(info)
+        raise SystemExit
+
     network = connections_to_graph(args.nr_cells, args.nr_dice_sides, final_connections, net, sim)
+    # Remove the read-out neurons that can never spike and merge parallel synapses
+    sim.optimize()
 
     sim.run(args.nr_cells, plotting=False)
 
@@ -365,3 +913,9 @@ if __name__ == "__main__":
     # python board_to_graph.py --nr_cells 20 --nr_dice_sides 2 --ladder_starts 2,9 --ladder_ends 12,19 --snake_starts 13 --snake_ends 8
     # python board_to_graph.py --nr_cells 100 --nr_dice_sides 6 --ladder_starts 1,4,8,21,28,50,71,80 --ladder_ends 38,14,20,42,76,67,92,99 --snake_starts 32,36,48,62,88,95,97 --snake_ends 10,6,26,18,24,56,78
     # python board_to_graph.py --nr_cells 6 --nr_dice_sides 2 --ladder_starts 2 --ladder_ends 4 --snake_starts 5 --snake_ends 1
+    # python board_to_graph.py --nr_cells 9 --nr_dice_sides 4 --ladder_starts 2 --ladder_ends 6 --snake_starts 8 --snake_ends 3 --all_distances
+    # python board_to_graph.py --nr_cells 20 --nr_dice_sides 2 --ladder_starts 2,9 --ladder_ends 12,19 --snake_starts 13 --snake_ends 8 --first_spike
+    # python board_to_graph.py --nr_cells 100 --nr_dice_sides 6 --ladder_starts 1,4,8,21,28,50,71,80 --ladder_ends 38,14,20,42,76,67,92,99 --snake_starts 32,36,48,62,88,95,97 --snake_ends 10,6,26,18,24,56,78 --monte_carlo 1000000 --seed 0
+    # python board_to_graph.py --nr_cells 100 --nr_dice_sides 6 --ladder_starts 1,4,8,21,28,50,71,80 --ladder_ends 38,14,20,42,76,67,92,99 --snake_starts 32,36,48,62,88,95,97 --snake_ends 10,6,26,18,24,56,78 --probe
+    # python board_to_graph.py --nr_cells 100 --nr_dice_sides 6 --ladder_starts 1,4,8,21,28,50,71,80 --ladder_ends 38,14,20,42,76,67,92,99 --snake_starts 32,36,48,62,88,95,97 --snake_ends 10,6,26,18,24,56,78 --bidirectional
+    # python board_to_graph.py --nr_cells 100 --nr_dice_sides 6 --ladder_starts 1,4,8,21,28,50,71,80 --ladder_ends 38,14,20,42,76,67,92,99 --snake_starts 32,36,48,62,88,95,97 --snake_ends 10,6,26,18,24,56,78 --template
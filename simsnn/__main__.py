@@ -21,12 +21,24 @@ def main():
         action="store_false",
         help="Suppress the plotting of a graph",
     )
+    parser.add_argument(
+        "-o",
+        "--output",
+        dest="output",
+        default=None,
+        metavar="PATH",
+        help="Write the plots to an image file instead of showing them",
+    )
     parser.set_defaults(graph=True)
 
     args = parser.parse_args()
 
+    options = {"graph": args.graph}
+    if args.output is not None:
+        options["path"] = args.output
+
     if args.f == "circuit":
-        circuit.run(duration=args.d, options={"graph": args.graph})
+        circuit.run(duration=args.d, options=options)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
 import numpy as np
 
+from simsnn.core.nodes import intern_id
+
 
 class Synapse:
     """Connection between two neurons
@@ -14,33 +16,73 @@ class Synapse:
         Connection weight
     d : int
         Synaptic delay (number of timesteps)
+    meta : object (Default: None)
+        Label of the synapse, e.g. for a ``SynapseProbe``; it is not used
+        by the simulation
     """
 
+    __slots__ = ("pre", "post", "w", "d", "ID", "meta", "_buffer", "index")
     count = 0
 
-    def __init__(self, pre, post, w=1, d=1, ID=None, increment_count=True):
+    def __init__(self, pre, post, w=1, d=1, ID=None, increment_count=True, meta=None):
         if d < 1:
             raise ValueError("Synaptic delay must be at least 1")
         self.pre = pre
         self.post = post
         self.w = w
-        self.out_pre = np.zeros(
-            (d)
-        )  # store output of the presynaptic neuron during d timesteps
+        self.d = d
+        self.meta = meta
+        # Store the output of the presynaptic neuron during d timesteps. A
+        # synapse with a delay of 1 delivers in the same step, so it needs no
+        # buffer at all; for longer delays the buffer is allocated on the
+        # first step, so that networks that are only run on array engines
+        # never hold it.
+        self._buffer = None
         self.index = 0
 
         if ID is None:
             self.ID = Synapse.count + 1
         else:
-            self.ID = ID
+            self.ID = intern_id(ID)
         if increment_count:
             Synapse.count += 1
 
-    def step(self):
+    @property
+    def out_pre(self):
+        """Output of the presynaptic neuron during the last d timesteps
+
+        A read-only copy: the buffer is built on every access, so writing to
+        it could not change the synapse. Use ``pending`` for the outputs that
+        are still to be delivered.
+        """
+        if self.d == 1:
+            out = np.array([self.pre.out], dtype=float)
+        elif self._buffer is None:
+            out = np.zeros(self.d)
+        else:
+            out = np.array(self._buffer, dtype=float)
+        out.flags.writeable = False
+        return out
 
-        self.out_pre[self.index] = self.pre.out  # store current output of pre
-        self.index = (self.index + 1) % len(self.out_pre)
-        self.post.I += self.w * self.out_pre[self.index]  # add w*pre_{t-d} to post
+    def pending(self):
+        """Presynaptic outputs that are still to be delivered, in delivery order
+
+        Empty if nothing was ever sent through the synapse.
+        """
+        if self._buffer is None:
+            return []
+        d = self.d
+        return [self._buffer[(self.index + 1 + k) % d] for k in range(d - 1)]
+
+    def step(self):
+        if self.d == 1:
+            self.post.I += self.w * self.pre.out  # add w*pre_t to post
+            return
+        if self._buffer is None:
+            self._buffer = [0] * self.d
+        self._buffer[self.index] = self.pre.out  # store current output of pre
+        self.index = (self.index + 1) % self.d
+        self.post.I += self.w * self._buffer[self.index]  # add w*pre_{t-d} to post
 
     def to_inet_string(self):
         return (
@@ -57,6 +99,6 @@ class Synapse:
             + ", "
             + str(self.w)
             + ", "
-            + str(self.out_pre.shape[0])
+            + str(self.d)
             + ")"
         )
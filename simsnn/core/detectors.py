@@ -1,21 +1,66 @@
 import numpy as np
 
 
+def _reserve(array, rows, columns, fill=0):
+    """Array with room for at least rows x columns that keeps the recorded values
+
+    The rows grow geometrically, so that recording in small increments
+    costs amortized constant time per step. Columns of targets that were
+    added since are filled with ``fill``.
+    """
+    if array.shape[0] >= rows and array.shape[1] == columns:
+        return array
+    grown = np.full((max(rows, 2 * array.shape[0]), columns), fill, dtype=array.dtype)
+    kept = min(array.shape[1], columns)
+    grown[: array.shape[0], :kept] = array[:, :kept]
+    return grown
+
+
 class Raster:
     def __init__(self, targets=None, ID=None, increment_count=True):
         self.targets = targets if targets is not None else []
         self.ID = ID
+        self.bind(None)
+
+    def bind(self, engine):
+        """Read the targets from the state arrays of an engine
+
+        Engines that return no indices (the object engine) are read through
+        the target objects.
+        """
+        self._engine = engine
+        self._indices = engine.indices(self.targets) if engine is not None else None
 
     def initialize(self, steps):
         self.spikes = np.zeros((steps, len(self.targets)), dtype=bool)
         self.index = 0
+        self._rows = steps
+
+    def extend(self, steps):
+        """Make room for ``steps`` more steps after the recorded ones
+
+        From now on only the recorded steps are returned.
+        """
+        self.spikes = _reserve(self.spikes, self.index + steps, len(self.targets))
+        self._rows = 0
+
+    def memory(self, steps):
+        """Bytes that ``initialize(steps)`` allocates"""
+        return steps * len(self.targets) * np.dtype(bool).itemsize
 
     def step(self):
-        self.spikes[self.index, :] = [target.out > 0 for target in self.targets]
+        if self._indices is None:
+            self.spikes[self.index, :] = [target.out > 0 for target in self.targets]
+        else:
+            self.spikes[self.index, :] = self._engine.out[self._indices] > 0
         self.index += 1
 
+    def skip(self, steps):
+        """Record steps that the engine skipped, in which nothing spikes"""
+        self.index += steps
+
     def get_measurements(self):
-        return self.spikes
+        return self.spikes[: max(self.index, self._rows)]
 
     def get_labels(self):
         return [t.ID for t in self.targets]
@@ -54,17 +99,48 @@ class Multimeter:
     def __init__(self, targets=None, ID=None, increment_count=True):
         self.targets = targets if targets is not None else []
         self.ID = ID
+        self.bind(None)
+
+    def bind(self, engine):
+        """Read the targets from the state arrays of an engine
+
+        Engines that return no indices (the object engine) are read through
+        the target objects.
+        """
+        self._engine = engine
+        self._indices = engine.indices(self.targets) if engine is not None else None
 
     def initialize(self, steps):
         self.V = np.zeros((steps, len(self.targets)))
         self.index = 0
+        self._rows = steps
+
+    def extend(self, steps):
+        """Make room for ``steps`` more steps after the recorded ones
+
+        From now on only the recorded steps are returned.
+        """
+        self.V = _reserve(self.V, self.index + steps, len(self.targets))
+        self._rows = 0
+
+    def memory(self, steps):
+        """Bytes that ``initialize(steps)`` allocates"""
+        return steps * len(self.targets) * np.dtype(float).itemsize
 
     def step(self):
-        self.V[self.index, :] = [target.V for target in self.targets]
+        if self._indices is None:
+            self.V[self.index, :] = [target.V for target in self.targets]
+        else:
+            self.V[self.index, :] = self._engine.V[self._indices]
         self.index += 1
 
+    def skip(self, steps):
+        """Record steps that the engine skipped, with the voltages it predicts"""
+        self.V[self.index : self.index + steps] = self._engine.trajectory(self._indices, steps)
+        self.index += steps
+
     def get_measurements(self):
-        return self.V
+        return self.V[: max(self.index, self._rows)]
 
     def get_labels(self):
         return [t.ID for t in self.targets]
@@ -97,3 +173,226 @@ class Multimeter:
             )
 
         return inet_string
+
+
+class FirstSpike:
+    """Detector that records the time of the first spike of every target
+
+    Instead of a (steps x targets) raster, only one int32 per target is
+    stored: the step of its first spike, or -1 if it has not spiked. When
+    ``predecessors`` is true, the detector also records which incoming
+    synapses delivered the input that triggered that first spike, i.e. the
+    synapses whose presynaptic neuron spiked exactly ``d`` steps earlier.
+
+    Parameters
+    ----------
+    targets : list (Default: None)
+        Nodes to record
+    predecessors : bool (Default: False)
+        If true, the triggering synapses are recorded as well
+    """
+
+    def __init__(self, targets=None, predecessors=False, ID=None, increment_count=True):
+        self.targets = targets if targets is not None else []
+        self.predecessors = predecessors
+        self.ID = ID
+        self.bind(None)
+
+    def bind(self, engine):
+        """Read the targets from the state arrays of an engine
+
+        Engines that return no indices (the object engine) are read through
+        the target objects. Predecessor tracking needs the synapses of the
+        network, so it only works when bound to an engine.
+        """
+        self._engine = engine
+        self._indices = engine.indices(self.targets) if engine is not None else None
+        self._incoming = [[] for _ in self.targets]
+        self._pre_nodes, self._pre_indices, self._history_size = [], None, 1
+        if not self.predecessors or engine is None:
+            return
+
+        targets = {id(t): j for j, t in enumerate(self.targets)}
+        pres = {}
+        for s in engine.network.synapses:
+            if id(s.post) in targets:
+                p = pres.setdefault(id(s.pre), (len(pres), s.pre))[0]
+                self._incoming[targets[id(s.post)]].append((p, s.d, s))
+        self._pre_nodes = [node for _, node in pres.values()]
+        self._pre_indices = engine.indices(self._pre_nodes)
+        self._history_size = max((d for inc in self._incoming for _, d, _ in inc), default=0) + 1
+
+    def initialize(self, steps):
+        self.times = np.full(len(self.targets), -1, dtype=np.int32)
+        self.index = 0
+        if self.predecessors:
+            self.triggers = [[] for _ in self.targets]
+            self._history = np.zeros((self._history_size, len(self._pre_nodes)), dtype=bool)
+
+    def extend(self, steps):
+        """Continue recording, for targets that were added since as well
+
+        The storage does not depend on the number of steps. When the
+        incoming synapses changed, the spike history of the presynaptic
+        neurons starts anew.
+        """
+        new = len(self.targets) - self.times.size
+        if new > 0:
+            self.times = np.concatenate([self.times, np.full(new, -1, dtype=np.int32)])
+            if self.predecessors:
+                self.triggers.extend([] for _ in range(new))
+        shape = (self._history_size, len(self._pre_nodes))
+        if self.predecessors and self._history.shape != shape:
+            self._history = np.zeros(shape, dtype=bool)
+
+    def memory(self, steps):
+        """Bytes that ``initialize(steps)`` allocates, independent of steps
+
+        The triggering synapses are not included, as their number is only
+        known after the run.
+        """
+        size = len(self.targets) * np.dtype(np.int32).itemsize
+        if self.predecessors:
+            size += self._history_size * len(self._pre_nodes)
+        return size
+
+    def step(self):
+        if self._indices is None:
+            spikes = np.array([target.out > 0 for target in self.targets], dtype=bool)
+        else:
+            spikes = self._engine.out[self._indices] > 0
+        new = np.flatnonzero(spikes & (self.times < 0))
+        self.times[new] = self.index
+
+        if self.predecessors:
+            t = self.index
+            if self._pre_indices is None:
+                self._history[t % self._history_size] = [n.out > 0 for n in self._pre_nodes]
+            else:
+                self._history[t % self._history_size] = self._engine.out[self._pre_indices] > 0
+            for j in new:
+                self.triggers[j] = [
+                    s
+                    for p, d, s in self._incoming[j]
+                    if t >= d and self._history[(t - d) % self._history_size, p]
+                ]
+        self.index += 1
+
+    def skip(self, steps):
+        """Record steps that the engine skipped, in which nothing spikes"""
+        if self.predecessors:
+            times = np.arange(self.index, self.index + min(steps, self._history_size))
+            self._history[times % self._history_size] = False
+        self.index += steps
+
+    def get_measurements(self):
+        return self.times
+
+    def get_predecessors(self):
+        """The synapses that triggered the first spike of every target"""
+        return self.triggers
+
+    def get_labels(self):
+        return [t.ID for t in self.targets]
+
+    def addTarget(self, target):
+        if isinstance(target, list):
+            self.targets.extend(target)
+        else:
+            self.targets.append(target)
+
+    def addTargets(self, target):
+        self.targets.extend(target)
+
+
+class SynapseProbe:
+    """Detector that records which synapses carried a spike, and when
+
+    An event ``(t, synapse)`` means that the presynaptic neuron of the
+    synapse spiked in step t, so that its input reaches the postsynaptic
+    neuron, which can spike in step ``t + synapse.d`` at the earliest.
+    Array engines report the synapses they delivered in every step, so
+    recording costs nothing per synapse; with the object engine the
+    presynaptic outputs of the recorded synapses are checked. A ``meta``
+    label on the synapses carries information into the events.
+
+    Parameters
+    ----------
+    synapses : list (Default: None)
+        Synapses to record; by default all synapses of the network
+    """
+
+    def __init__(self, synapses=None, ID=None, increment_count=True):
+        self.synapses = synapses
+        self.ID = ID
+        self.bind(None)
+
+    def bind(self, engine):
+        """Read the delivered synapses from an engine
+
+        Engines that return no indices (the object engine) are read through
+        the synapse objects.
+        """
+        self._engine = engine
+        self._watch = None
+        self._lookup = list(self.synapses) if self.synapses is not None else []
+        self._objects = engine is None or engine.indices([]) is None
+        if engine is None:
+            return
+        synapses = engine.network.synapses
+        if self._objects:
+            self._lookup = list(self.synapses) if self.synapses is not None else list(synapses)
+            return
+        # Events are stored as edge ids, which follow the synapses of the network
+        self._lookup = list(synapses)
+        if self.synapses is not None:
+            edges = {id(s): e for e, s in enumerate(synapses)}
+            self._watch = np.zeros(len(synapses), dtype=bool)
+            self._watch[[edges[id(s)] for s in self.synapses if id(s) in edges]] = True
+
+    def initialize(self, steps):
+        self._times, self._keys = [], []
+        self.index = 0
+
+    def extend(self, steps):
+        """Continue recording; events are stored as they occur"""
+
+    def memory(self, steps):
+        """Bytes that ``initialize(steps)`` allocates; events are stored as they occur"""
+        return 0
+
+    def step(self):
+        if self._objects:
+            keys = np.array(
+                [k for k, s in enumerate(self._lookup) if s.pre.out != 0], dtype=np.intp
+            )
+        else:
+            keys = self._engine.delivered
+            if self._watch is not None:
+                keys = keys[keys < self._watch.size]
+                keys = keys[self._watch[keys]]
+        if keys.size:
+            self._times.append(np.full(keys.size, self.index, dtype=np.int64))
+            self._keys.append(keys)
+        self.index += 1
+
+    def skip(self, steps):
+        """Record steps that the engine skipped, in which no synapse carries a spike"""
+        self.index += steps
+
+    def get_measurements(self):
+        """The events as a list of (step, synapse) tuples, ordered by step
+
+        Synapses that were added to a compiled engine have no object and
+        are given by their edge id.
+        """
+        if not self._keys:
+            return []
+        times = np.concatenate(self._times).tolist()
+        keys = np.concatenate(self._keys).tolist()
+        lookup = self._lookup
+        return [(t, lookup[k] if k < len(lookup) else k) for t, k in zip(times, keys)]
+
+    def get_labels(self):
+        return [s.ID for s in self._lookup]
+
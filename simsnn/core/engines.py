@@ -0,0 +1,1233 @@
+import copy
+import heapq
+
+import numpy as np
+
+from simsnn.core.nodes import LIF, InputTrain, RandomSpiker, StimulusNeuron, StimulusPopulation
+
+
+_NO_EDGES = np.zeros(0, dtype=np.intp)
+
+
+def _ramp(V, c, V_min, steps, thr=np.inf):
+    """Float result of ``steps`` steps ``V <- max(V + c, V_min)``, bit for bit
+
+    The floats of a binade are evenly spaced, so within one every step adds
+    the same rounded multiple of the spacing, and all steps that stay in it
+    are taken at once. The steps stop before the first one that reaches
+    ``thr``. Subnormal numbers are not handled.
+
+    Returns
+    -------
+    V : np.ndarray
+        Values after the steps that were taken
+    taken : np.ndarray
+        Number of steps taken: ``steps``, or fewer where ``thr`` is reached
+    exact : np.ndarray
+        False where a subnormal number stopped the steps early
+    """
+    V, c, V_min, thr, steps = np.broadcast_arrays(V, c, V_min, thr, steps)
+    shape = V.shape
+    V = V.astype(float).ravel()
+    c, V_min, thr = c.astype(float).ravel(), V_min.astype(float).ravel(), thr.astype(float).ravel()
+    left = steps.astype(np.int64).ravel()
+    taken = np.zeros(V.size, dtype=np.int64)
+    exact = np.ones(V.size, dtype=bool)
+    top = 2.0**53 - 1
+    # Every round leaves a binade (or ends), and there are about 2100 of them
+    for _ in range(2200):
+        active = np.flatnonzero((left > 0) & exact)
+        if not active.size:
+            break
+        # One step as the engines take it, which may enter the next binade
+        cc, low, high = c[active], V_min[active], thr[active]
+        V_next = np.maximum(V[active] + cc, low)
+        crossed = V_next >= high
+        left[active[crossed]] = 0
+        keep = ~crossed
+        active, V_next, cc, low, high = (x[keep] for x in (active, V_next, cc, low, high))
+        V[active] = V_next
+        taken[active] += 1
+        left[active] -= 1
+
+        # Positions on the grid of the binade, 2**52 <= |p| < 2**53
+        with np.errstate(all="ignore"):
+            u = np.ldexp(1.0, np.frexp(V_next)[1] - 53)
+            p, q = V_next / u, cc / u
+            # Ties round to even, so once p is even every step adds rint(q)
+            n = np.rint(q)
+            odd_tie = (np.abs(q - np.trunc(q)) == 0.5) & (p % 2 != 0)
+            # Sums just below 2**52 round to the finer grid of the binade below
+            lower = np.maximum(np.where(p > 0, 2.0**52 + 1, -top), np.ceil(low / u))
+            upper = np.minimum(np.where(p > 0, top, -(2.0**52 + 1)), np.ceil(high / u) - 1)
+        stuck = (V_next != 0) & (np.abs(V_next) < np.finfo(float).tiny)
+        exact[active[stuck]] = False
+        # Values held at V_min stay there
+        held = (V_next == low) & (cc <= 0)
+        ok = ~stuck & ~held & ~odd_tie & (V_next != 0) & (np.abs(n) < 2.0**53)
+        ok &= (lower <= p) & (p <= upper)
+        n_int = np.where(ok, n, 0).astype(np.int64)
+        span = np.where(ok, np.where(n_int > 0, upper - p, p - lower), 0).astype(np.int64)
+        K = span // np.maximum(np.abs(n_int), 1)
+        K = np.where((ok & (n_int == 0)) | held, left[active], K)
+        K = np.minimum(K, left[active])
+        p = np.where(ok, p, 0).astype(np.int64)
+        V[active] = np.where(ok & (K > 0), (p + K * n_int) * u, V_next)
+        taken[active] += K
+        left[active] -= K
+    exact &= left == 0
+    return V.reshape(shape), taken.reshape(shape), exact.reshape(shape)
+
+
+class ObjectEngine:
+    """Engine that steps the node and synapse objects of the network
+
+    This is the reference implementation: every node and synapse is a
+    Python object that is updated one by one.
+
+    Parameters
+    ----------
+    network : Network
+        Network to simulate
+    rng : np.random.RandomState (Default: None)
+        Unused, the nodes keep their own random generators
+    """
+
+    name = "object"
+
+    def __init__(self, network, rng=None):
+        self.network = network
+        self.t = 0
+
+    def step(self):
+        self.network.step()
+        self.t += 1
+
+    def indices(self, nodes):
+        """Object engines are read through the node objects themselves"""
+        return None
+
+    def sync(self):
+        pass
+
+
+class VectorizedEngine:
+    """Engine that keeps the state of all nodes and synapses in arrays
+
+    The network is compiled once: the parameters of the LIF neurons become
+    arrays, the synapses become a CSR structure ordered by presynaptic
+    neuron, and synaptic delays are handled by a ring buffer that holds the
+    input of every neuron for the next ``max(d)`` steps. At every step only
+    the outgoing synapses of the neurons that spiked are visited, and their
+    edge ids are kept in ``delivered`` until the next step. The node
+    objects are not touched until ``sync`` is called.
+
+    The topology of a compiled engine can be edited while it runs, without
+    recompiling (see ``add_synapse``, ``remove_synapse``, ``set_weight``,
+    ``add_neuron`` and ``remove_neuron``). Synapses keep a stable edge id:
+    the synapses of the network are edges ``0 .. len(network.synapses)-1``
+    and added synapses get the next free id. Added synapses go into an
+    overlay per presynaptic neuron and removed ones are masked, so an edit
+    costs O(degree). Once the overlay and the masked edges exceed
+    ``compaction`` times the number of edges in the CSR structure, it is
+    rebuilt at the start of the next step. The node and synapse objects of
+    the network are not changed by these edits.
+
+    ``InputTrain`` and ``RandomSpiker`` nodes are compiled as well; the
+    random spikers draw from the engine's generator instead of their own.
+    A ``StimulusPopulation`` produces the output of all its neurons as one
+    slice of the state arrays. Other node types are stepped as objects.
+
+    Parameters
+    ----------
+    network : Network
+        Network to simulate
+    rng : np.random.RandomState (Default: None)
+        Random generator for the noise and the random spikers
+    """
+
+    name = "vectorized"
+    dtype = np.float64
+
+    compaction = 0.1
+    # Longest stretch of LIF voltages that float engines forecast at once
+    forecast = 4096
+    # Steps before a predicted threshold crossing that float engines forecast
+    # by stepping, instead of jumping over them in closed form
+    exact_steps = 4
+
+    def __init__(self, network, rng=None):
+        self.network = network
+        self.rng = rng if rng is not None else np.random.RandomState()
+        self.t = 0
+        self._buffers = {}
+        # LIF voltages forecast by idle_steps: (step, rows, steady), or None
+        # when they follow the closed form
+        self._forecast = None
+        # Step from which float voltages are forecast by stepping, as a
+        # threshold crossing is near
+        self._exact_from = None
+        # Edge ids of the synapses that carried a spike in the last step
+        self.delivered = _NO_EDGES
+        self._compile_nodes()
+        self._compile_synapses()
+
+    def _compile_nodes(self):
+        dtype = self.dtype
+        # Every node takes one slot in the state arrays, a population one per neuron
+        self.nodes = list(self.network.nodes)
+        self._index = {}
+        self.populations = []
+        units = []
+        for node in self.nodes:
+            if isinstance(node, StimulusPopulation):
+                self.populations.append((len(units), node))
+                for neuron in node.neurons:
+                    self._index[id(neuron)] = len(units)
+                    units.append(neuron)
+            else:
+                self._index[id(node)] = len(units)
+                units.append(node)
+        self.units = units
+        self.n = len(units)
+
+        lif, trains, spikers, objects = [], [], [], []
+        for i, node in enumerate(units):
+            if isinstance(node, LIF):
+                lif.append(i)
+            elif isinstance(node, InputTrain):
+                trains.append(i)
+            elif isinstance(node, RandomSpiker):
+                spikers.append(i)
+            elif not isinstance(node, StimulusNeuron):
+                objects.append(i)
+
+        self.V = np.array([node.V for node in units], dtype=dtype)
+        self.I = np.array([node.I for node in units], dtype=dtype)
+        self.out = np.array([node.out for node in units], dtype=self._out_dtype())
+
+        lif = np.array(lif, dtype=np.intp)
+        # Index with a slice when the LIF neurons are contiguous, which avoids copies
+        if lif.size and lif[-1] - lif[0] + 1 == lif.size:
+            self.lif = slice(int(lif[0]), int(lif[-1]) + 1)
+        else:
+            self.lif = lif
+        neurons = [units[i] for i in lif]
+        for name in ("m", "V_reset", "V_min", "thr", "amplitude", "I_e", "noise"):
+            setattr(self, name, np.array([getattr(n, name) for n in neurons], dtype=dtype))
+        self._noisy = np.flatnonzero(self.noise > 0)
+        # Position of every slot in the parameter arrays, -1 for other nodes
+        self._lif_pos = np.full(self.n, -1, dtype=np.intp)
+        self._lif_pos[self.lif] = np.arange(self.m.size)
+
+        self.trains = np.array(trains, dtype=np.intp)
+        train_lists = [list(units[i].train) for i in trains]
+        self._train_size = np.array([len(t) for t in train_lists], dtype=np.intp)
+        self._train_values = np.zeros((len(trains), max(self._train_size, default=0) + 1), dtype=dtype)
+        for k, train in enumerate(train_lists):
+            self._train_values[k, : len(train)] = train
+        self._train_loop = np.array([units[i].loop for i in trains], dtype=bool)
+        self._train_index = np.array([units[i].index for i in trains], dtype=np.intp)
+
+        self.spikers = np.array(spikers, dtype=np.intp)
+        self._spiker_p = np.array([units[i].p for i in spikers], dtype=float)
+        self._spiker_amplitude = np.array([units[i].amplitude for i in spikers], dtype=dtype)
+
+        self.objects = np.array(objects, dtype=np.intp)
+
+    def _out_dtype(self):
+        return self.dtype
+
+    def _compile_synapses(self):
+        synapses = self.network.synapses
+        index = self._index
+        self.pre = np.array([index[id(s.pre)] for s in synapses], dtype=np.intp)
+        self.post = np.array([index[id(s.post)] for s in synapses], dtype=np.intp)
+        self.w = np.array([s.w for s in synapses], dtype=self.dtype)
+        self.d = np.array([s.d for s in synapses], dtype=np.intp)
+        self.order = np.argsort(self.pre, kind="stable")
+        self.indptr = np.searchsorted(self.pre[self.order], np.arange(self.n + 1))
+        self.alive = np.ones(len(synapses), dtype=bool)
+        self.removed = np.zeros(self.n, dtype=bool)
+        # Edges added after the last compaction, per presynaptic neuron
+        self._overlay = {}
+        self._has_overlay = np.zeros(self.n, dtype=bool)
+        self._overlay_size = 0
+        self._masked = 0
+        self._compact_due = False
+
+        self.D = int(self.d.max()) if self.d.size else 1
+        self._compile_ring(synapses)
+
+    def _compile_ring(self, synapses):
+        # ring[(t + k) % D] holds the input that arrives k steps from now
+        self.ring = np.zeros((self.D, self.n), dtype=self.dtype)
+        for s, post, w in zip(synapses, self.post, self.w):
+            for k, value in enumerate(s.pending()):
+                self.ring[k % self.D, post] += w * value
+        # Rows of the ring that input was scheduled into, and their number
+        self._pending = self.ring.any(axis=1)
+        self._nr_pending = int(np.count_nonzero(self._pending))
+
+    def indices(self, nodes):
+        """Positions of the given nodes in the state arrays"""
+        return np.array([self._index[id(node)] for node in nodes], dtype=np.intp)
+
+    def step(self):
+        if self._compact_due:
+            self.compact()
+        if self.trains.size:
+            self._step_trains()
+        if self.spikers.size:
+            spikes = self._uniform(self.spikers.size) < self._spiker_p
+            self.V[..., self.spikers] = np.where(spikes, self._spiker_amplitude, 0)
+            self.out[..., self.spikers] = self.V[..., self.spikers]
+        for base, population in self.populations:
+            population.step()
+            self.out[..., base : base + population.size] = population.out
+            self.V[..., base : base + population.size] = population.out
+        for i in self.objects:
+            node = self.units[i]
+            node.I = self.I[i].item()
+            node.step()
+            self.V[i], self.out[i] = node.V, node.out
+        self._step_lif()
+        self._deliver()
+        self.t += 1
+
+    def _uniform(self, size):
+        return self.rng.random_sample(size)
+
+    def _normal(self, scale):
+        return self.rng.normal(scale=scale)
+
+    def _step_trains(self):
+        size = self._train_size
+        index = self._train_index
+        position = np.where(self._train_loop & (size > 0), index % np.maximum(size, 1), index)
+        position = np.where(position < size, position, self._train_values.shape[1] - 1)
+        values = self._train_values[np.arange(size.size), position]
+        self.V[..., self.trains] = values
+        self.out[..., self.trains] = values
+        self._train_index = index + 1
+
+    def _step_lif(self):
+        lif = self.lif
+        V = self.V[..., lif] * self.m + self.I[..., lif]  # update V
+        if self._noisy.size:
+            V[..., self._noisy] += self._normal(self.noise[self._noisy])  # add noise
+        np.maximum(V, self.V_min, out=V)
+        spikes = V >= self.thr  # check for spike
+        np.copyto(V, self.V_reset, where=spikes)
+        self.V[..., lif] = V
+        self.out[..., lif] = np.where(spikes, self.amplitude, 0)
+        self.I[..., lif] = self.I_e  # reset I with I_e
+
+    def _deliver(self):
+        slot = self.t % self.D
+        # With a batch dimension, the synapses of every neuron that spiked in any batch are visited
+        out = self.out
+        active = np.flatnonzero(out if out.ndim == 1 else out.any(axis=0))
+        self.delivered = edges = self._outgoing(active) if active.size else _NO_EDGES
+        if edges.size:
+            values = (self.w[edges] * out[..., self.pre[edges]]).T
+            if self.D == 1:
+                np.add.at(self.ring[0].T, self.post[edges], values)
+            else:
+                slots = (slot + self.d[edges] - 1) % self.D
+                np.add.at(np.moveaxis(self.ring, -1, 1), (slots, self.post[edges]), values)
+                fresh = slots[~self._pending[slots]]
+                if fresh.size:
+                    fresh = np.unique(fresh)
+                    self._pending[fresh] = True
+                    self._nr_pending += fresh.size
+        self.I += self.ring[slot]
+        self.ring[slot] = 0
+        if self._pending[slot]:
+            self._pending[slot] = False
+            self._nr_pending -= 1
+
+    def _outgoing(self, slots):
+        """Edge ids of the live outgoing synapses of the given slots"""
+        starts = self.indptr[slots]
+        counts = self.indptr[slots + 1] - starts
+        total = int(counts.sum())
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        edges = self.order[offsets + np.arange(total)]
+        if self._overlay_size:
+            extra = slots[self._has_overlay[slots]]
+            if extra.size:
+                added = np.concatenate([self._overlay[i] for i in extra.tolist()])
+                edges = np.concatenate([edges, added.astype(np.intp)])
+        if self._masked:
+            edges = edges[self.alive[edges]]
+        return edges
+
+    def _append(self, name, values):
+        """Append values along the last axis of an array attribute
+
+        The attribute becomes a view of a larger buffer whose capacity is
+        doubled when it is full, so that appending is amortized O(1).
+        """
+        array = getattr(self, name)
+        values = np.asarray(values)
+        size = array.shape[-1]
+        new = size + (values.shape[-1] if values.ndim else 1)
+        buffer = self._buffers.get(name)
+        if (
+            buffer is None
+            or array.base is not buffer
+            or buffer.shape[:-1] != array.shape[:-1]
+            or buffer.shape[-1] < new
+        ):
+            buffer = np.zeros(array.shape[:-1] + (max(new, 2 * size, 8),), dtype=array.dtype)
+            buffer[..., :size] = array
+            self._buffers[name] = buffer
+        buffer[..., size:new] = values
+        setattr(self, name, buffer[..., :new])
+
+    def _slot(self, node):
+        slot = self._index.get(id(node))
+        if slot is None:
+            raise ValueError(f"Node {node.ID} is not part of the compiled network")
+        if self.removed[slot]:
+            raise ValueError(f"Node {node.ID} was removed")
+        return slot
+
+    def _edge(self, edge):
+        edge = int(edge)
+        if not 0 <= edge < self.alive.size or not self.alive[edge]:
+            raise ValueError(f"Synapse {edge} does not exist")
+        return edge
+
+    def _lif_position(self, slot):
+        """Position of a LIF slot in the parameter arrays, or None"""
+        k = int(self._lif_pos[slot])
+        return k if k >= 0 else None
+
+    def _edited(self):
+        if self._overlay_size + self._masked > self.compaction * self.order.size + 64:
+            self._compact_due = True
+
+    def _grow_delay(self, D):
+        """Enlarge the ring buffer so that it holds the input of the next D steps"""
+        k = np.arange(self.D)
+        ring = np.zeros((D,) + self.ring.shape[1:], dtype=self.ring.dtype)
+        ring[(self.t + k) % D] = self.ring[(self.t + k) % self.D]
+        pending = np.zeros(D, dtype=bool)
+        pending[(self.t + k) % D] = self._pending[(self.t + k) % self.D]
+        self.ring, self._pending = ring, pending
+        self.D = D
+
+    def add_synapse(self, pre, post, w=1, d=1):
+        """Add a synapse to the compiled network
+
+        The synapse starts without input in flight.
+
+        Parameters
+        ----------
+        pre, post : Neuron
+            Presynaptic and postsynaptic node, both part of the engine
+        w : float (Default: 1)
+            Connection weight
+        d : int (Default: 1)
+            Synaptic delay (number of timesteps)
+
+        Returns
+        -------
+        int
+            Edge id of the new synapse
+        """
+        if d < 1:
+            raise ValueError("Synaptic delay must be at least 1")
+        i, j = self._slot(pre), self._slot(post)
+        self._check_weight(i, j, 0, w)
+        if d > self.D:
+            self._grow_delay(int(d))
+        edge = self.alive.size
+        self._append("pre", i)
+        self._append("post", j)
+        self._append("w", w)
+        self._append("d", d)
+        self._append("alive", True)
+        self._overlay.setdefault(i, []).append(edge)
+        self._has_overlay[i] = True
+        self._overlay_size += 1
+        self._edited()
+        return edge
+
+    def remove_synapse(self, edge):
+        """Remove a synapse by edge id; input already in flight is still delivered"""
+        edge = self._edge(edge)
+        self.alive[edge] = False
+        self._masked += 1
+        self._edited()
+
+    def set_weight(self, edge, w):
+        """Change the weight of a synapse; input already in flight keeps the old weight"""
+        edge = self._edge(edge)
+        self._check_weight(self.pre[edge], self.post[edge], self.w[edge], w)
+        self.w[edge] = w
+
+    def find_synapses(self, pre, post=None):
+        """Edge ids of the synapses from pre (to post), in O(out-degree of pre)"""
+        edges = self._outgoing(np.array([self._slot(pre)], dtype=np.intp))
+        edges = edges[~self.removed[self.post[edges]]]
+        if post is not None:
+            edges = edges[self.post[edges] == self._slot(post)]
+        return edges
+
+    def add_neuron(self, neuron):
+        """Add a LIF neuron to the compiled network
+
+        The neuron starts with its current voltage and input. It is not
+        added to the network object, but it can be recorded by detectors.
+
+        Parameters
+        ----------
+        neuron : LIF
+            The new neuron
+
+        Returns
+        -------
+        int
+            Slot of the neuron in the state arrays
+        """
+        if not isinstance(neuron, LIF):
+            raise ValueError("Only LIF neurons can be added to a compiled network")
+        if id(neuron) in self._index:
+            raise ValueError(f"Neuron {neuron.ID} is already part of the compiled network")
+        self._check_neuron(neuron)
+        slot = self.n
+        for name, value in (("V", neuron.V), ("I", neuron.I), ("out", neuron.out)):
+            self._append(name, np.full(getattr(self, name).shape[:-1] + (1,), value))
+        self._append("ring", np.zeros(self.ring.shape[:-1] + (1,)))
+        self._append("indptr", self.indptr[-1])
+        self._append("removed", False)
+        self._append("_has_overlay", False)
+        for name in ("m", "V_reset", "V_min", "thr", "amplitude", "I_e", "noise"):
+            self._append(name, getattr(neuron, name))
+        self._append("_lif_pos", self.m.size - 1)
+        if isinstance(self.lif, slice) and self.lif.stop == slot:
+            self.lif = slice(self.lif.start, slot + 1)
+        elif not isinstance(self.lif, slice) and self.lif.size == 0:
+            self.lif = slice(slot, slot + 1)
+        else:
+            self.lif = np.append(np.arange(self.n)[self.lif], slot)
+        if neuron.noise > 0:
+            self._noisy = np.flatnonzero(self.noise > 0)
+        self._index[id(neuron)] = slot
+        self.units.append(neuron)
+        self.n += 1
+        return slot
+
+    def remove_neuron(self, node):
+        """Remove a neuron or generator from the compiled network
+
+        Its outgoing synapses are removed and it is silenced: it keeps its
+        slot (and edge ids stay valid), but it never produces output again.
+        Synapses towards it are dropped at the next compaction.
+        """
+        slot = self._slot(node)
+        k = self._lif_position(slot)
+        if k is not None:
+            for name in ("m", "V_reset", "V_min", "amplitude", "I_e", "noise"):
+                getattr(self, name)[k] = 0
+            self._noisy = np.flatnonzero(self.noise > 0)
+        elif slot in self.trains:
+            self._train_values[int(np.searchsorted(self.trains, slot))] = 0
+        elif slot in self.spikers:
+            self._spiker_p[int(np.searchsorted(self.spikers, slot))] = 0
+        else:
+            raise ValueError(f"Node {node.ID} cannot be removed from a compiled network")
+        edges = self.find_synapses(node)
+        self.alive[edges] = False
+        self._masked += edges.size
+        self.removed[slot] = True
+        self.V[..., slot] = self.I[..., slot] = self.out[..., slot] = 0
+        self.ring[..., slot] = 0
+        self._edited()
+
+    def compact(self):
+        """Rebuild the CSR structure from the live edges, emptying the overlay"""
+        self.alive[self.removed[self.post]] = False
+        live = np.flatnonzero(self.alive)
+        self.order = live[np.argsort(self.pre[live], kind="stable")]
+        self.indptr = np.searchsorted(self.pre[self.order], np.arange(self.n + 1))
+        self._overlay = {}
+        self._has_overlay[:] = False
+        self._overlay_size = 0
+        self._masked = 0
+        self._compact_due = False
+
+    # Arrays that are only ever replaced or appended to, never changed in
+    # place, so that forks can share them
+    _shared = ("pre", "post", "d", "order", "indptr", "trains", "spikers", "objects")
+
+    def fork(self):
+        """Copy of the engine that shares the compiled synapse structure
+
+        The copy starts in the current state, and its state and topology
+        edits are its own: the arrays that steps or edits change in place
+        are copied, while the synapse structure is shared until the copy
+        appends to it or compacts it (copy-on-write). This is much cheaper
+        than compiling the network again. Both engines keep using the same
+        network, node objects and random generator.
+
+        Returns
+        -------
+        VectorizedEngine
+            The copy
+        """
+        fork = copy.copy(self)
+        fork._buffers = {}
+        for name, value in vars(self).items():
+            if isinstance(value, np.ndarray) and name not in self._shared:
+                setattr(fork, name, value.copy())
+        fork._overlay = {i: list(edges) for i, edges in self._overlay.items()}
+        fork._index = dict(self._index)
+        fork.units = list(self.units)
+        return fork
+
+    def _check_weight(self, pre, post, old, new):
+        """Hook to validate a weight edit on the synapse pre -> post"""
+        pass
+
+    def _check_neuron(self, neuron):
+        """Hook to validate a neuron before it is added"""
+        pass
+
+    def idle_steps(self):
+        """Number of upcoming steps that ``skip`` can advance without simulating them
+
+        Steps can be skipped while no input is in flight or arriving, no
+        generator produces output and no neuron crosses its threshold. LIF
+        neurons then follow ``V <- max(m * V + I_e, V_min)``. With ``0 <= m
+        <= 1`` this has a closed form, and so has the step of their next
+        threshold crossing. With integers the closed form is exact. With
+        floats it rounds differently from stepping, so the engine jumps to
+        ``exact_steps`` steps before the crossing and forecasts the rest
+        with the same update as a step. When the closed form comes within
+        rounding distance of a threshold, where the two could disagree on
+        the step of the spike, all voltages are forecast by stepping, for at
+        most ``forecast`` steps at a time. The spikes are then those of
+        stepping, and the skipped voltages agree with stepping up to
+        rounding. Random spikers (with p > 0), noise, stimulus populations
+        and other node types prevent skipping.
+
+        Returns
+        -------
+        int or None
+            Number of steps that can be skipped (0 if the next step must be
+            simulated), or None if nothing will ever happen again
+        """
+        if self.out.ndim > 1 or self.populations or self.objects.size or self._noisy.size:
+            return 0
+        if self.spikers.size and np.any(self._spiker_p > 0):
+            return 0
+        horizons = [h for h in (self._input_horizon(), self._train_horizon()) if h is not None]
+        if horizons and min(horizons) == 0:
+            return 0
+        lif = self._lif_horizon(min(horizons) if horizons else None)
+        if lif is not None:
+            horizons.append(lif)
+        return min(horizons) if horizons else None
+
+    def _input_horizon(self):
+        """Steps until input arrives from the ring buffer, or None"""
+        if not self._nr_pending:
+            return None
+        if self._pending[self.t % self.D]:
+            return 0
+        rows = np.flatnonzero(self._pending)
+        return int(((rows - self.t) % self.D).min())
+
+    def _train_horizon(self):
+        """Steps until an input train produces a nonzero value, or None"""
+        horizon = None
+        for k in range(self.trains.size):
+            size, index = int(self._train_size[k]), int(self._train_index[k])
+            values = np.flatnonzero(self._train_values[k, :size])
+            if self._train_loop[k] and values.size:
+                position = index % size
+                later = values[values >= position]
+                steps = later[0] - position if later.size else values[0] + size - position
+            else:
+                later = values[values >= index]
+                if not later.size:
+                    continue
+                steps = later[0] - index
+            horizon = int(steps) if horizon is None else min(horizon, int(steps))
+        return horizon
+
+    def _lif_horizon(self, limit=None):
+        """Steps that the LIF neurons can be advanced before one spikes, or None
+
+        ``limit`` is the number of steps after which something else happens
+        (None if nothing does); forecasts by stepping go no further.
+        """
+        m, thr = self.m, self.thr
+        if not m.size:
+            return None
+        if (self.I[self.lif] != self.I_e).any():
+            return 0
+        self._forecast = None
+        integral = np.issubdtype(self.dtype, np.integer)
+        if ((m < 0) | (m > 1)).any():
+            return 0 if integral else self._forecast_lif(limit)
+        if not integral and self._exact_from == self.t:
+            return self._forecast_lif(limit)
+        spike, V_inf, unsure = self._lif_crossings()
+        first = spike.min()
+        if integral:
+            return max(int(first) - 1, 0) if np.isfinite(first) else None
+        if first <= self.exact_steps + 1:
+            return self._forecast_lif(limit)
+
+        # Rounding errors of the leaky closed form grow with the number of
+        # steps, until the voltages have converged
+        V = self.V[self.lif]
+        scale = np.maximum(np.maximum(np.abs(V), np.abs(thr)), np.abs(self.I_e))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.fmax(scale, np.abs(V_inf))
+            memory = np.where(m < 1, 1 / (1 - m), np.inf)
+        crossing = np.isfinite(spike)
+        j = np.where(crossing, spike, 2)
+        before, after = self._closed_form(np.stack([j - 1, j]))
+        margin = 16 * np.finfo(self.dtype).eps * scale * np.minimum(j + 1, memory)
+        leaky = (m > 0) & (m < 1)
+        tie = crossing & ((after - thr <= margin) | (thr - before <= margin))
+        # Leaky voltages that converge to their threshold
+        tie |= ~crossing & (np.abs(V_inf - thr) <= margin)
+        tie = (leaky & tie) | unsure
+        if tie.any():
+            return self._forecast_lif(limit)
+        if not np.isfinite(first):
+            return None
+        horizon = int(first) - 1 - self.exact_steps
+        if limit is not None and limit < horizon:
+            return limit
+        self._exact_from = self.t + horizon
+        return horizon
+
+    def _lif_crossings(self):
+        """Upcoming step (1 = next) of the next threshold crossing of every LIF neuron
+
+        Returns
+        -------
+        spike : np.ndarray
+            Step of the crossing in closed form, inf if there is none
+        V_inf : np.ndarray
+            Voltage that leaky neurons converge to, nan for the others
+        unsure : np.ndarray
+            True where the crossing of a float voltage without leak is unknown
+        """
+        m, I_e, V_min, thr = self.m, self.I_e, self.V_min, self.thr
+        V = self.V[self.lif]
+        V1 = np.maximum(V * m + I_e, V_min)
+        spike = np.where(V1 >= thr, 1.0, np.inf)
+        unsure = np.zeros(m.shape, dtype=bool)
+        below = V1 < thr
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rising = below & (m == 1) & (I_e > 0)
+            if np.issubdtype(self.dtype, np.integer):
+                spike[rising] = 1 + np.ceil((thr - V1)[rising] / I_e[rising])
+            elif rising.any():
+                # Float sums round at every step, so they are followed exactly
+                never = 2**62
+                _, taken, exact = _ramp(V[rising], I_e[rising], V_min[rising], never, thr[rising])
+                spike[rising] = np.where(taken < never, taken + 1, np.inf)
+                unsure[rising] = ~exact
+            V_inf = np.where((m > 0) & (m < 1), I_e / (1 - m), np.nan)
+            rising = below & (m > 0) & (m < 1) & (V_inf > thr)
+            ratio = (V_inf - thr)[rising] / (V_inf - V1)[rising]
+            spike[rising] = 1 + np.ceil(np.log(ratio) / np.log(m[rising]))
+        return spike, V_inf, unsure
+
+    def _closed_form(self, steps, pos=slice(None)):
+        """Voltages of LIF neurons without input after the given numbers of steps
+
+        ``pos`` selects neurons by their position in the parameter arrays;
+        ``steps`` broadcasts against them. Float voltages without leak are
+        exactly those of stepping.
+        """
+        m, I_e, V_min = self.m[pos], self.I_e[pos], self.V_min[pos]
+        V0 = self.V[self.lif][pos]
+        V1 = np.maximum(V0 * m + I_e, V_min)
+        j = steps - 1
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            V_inf = np.where(m < 1, I_e / (1 - m), 0)
+            leaky = V_inf + (V1 - V_inf) * m**j
+        V = np.where(m == 1, V1 + j * I_e, np.where(m == 0, V1, leaky))
+        V = np.maximum(V, V_min)
+        linear = np.broadcast_to(m == 1, V.shape)
+        if not np.issubdtype(self.dtype, np.integer) and linear.any():
+            ramp = (np.broadcast_to(x, V.shape)[linear] for x in (V0, I_e, V_min, steps))
+            V[linear] = _ramp(*ramp)[0]
+        return V.astype(self.dtype)
+
+    def _forecast_lif(self, limit=None):
+        """Step the LIF voltages without input until one spikes, and keep them for ``skip``
+
+        Returns
+        -------
+        int or None
+            Number of steps before the first spike, ``limit`` (or
+            ``forecast``) if there is none before, or None if the voltages
+            reached a fixed point below the thresholds
+        """
+        m, I_e, V_min, thr = self.m, self.I_e, self.V_min, self.thr
+        steps = self.forecast if limit is None else min(limit, self.forecast)
+        V = self.V[self.lif]
+        rows, steady = [], False
+        for _ in range(steps):
+            V_next = np.maximum(V * m + I_e, V_min)
+            if (V_next >= thr).any():
+                # The crossing stays near until it happens
+                self._exact_from = self.t + len(rows)
+                break
+            if (V_next == V).all():
+                steady = True
+                break
+            rows.append(V_next)
+            V = V_next
+        self._forecast = (self.t, np.array(rows).reshape(len(rows), m.size), steady)
+        if steady:
+            return None if limit is None else limit
+        return len(rows)
+
+    def _lif_voltages(self, pos, steps):
+        """Voltages of LIF neurons without input after each of the given numbers of steps
+
+        ``pos`` selects neurons by their position in the parameter arrays.
+        The forecast of ``idle_steps`` is used when it made one, and the
+        closed form otherwise.
+        """
+        steps = np.asarray(steps)
+        if self._forecast is not None and self._forecast[0] == self.t:
+            return self._forecast_rows(int(steps.max()))[steps - 1][:, pos]
+        return self._closed_form(steps[:, None], pos)
+
+    def _forecast_rows(self, steps):
+        """LIF voltages after 1 .. steps steps, from the forecast of ``idle_steps``"""
+        _, rows, steady = self._forecast
+        if rows.shape[0] < steps:
+            last = rows[-1] if rows.shape[0] else self.V[self.lif]
+            rows = np.concatenate([rows, np.broadcast_to(last, (steps - rows.shape[0], last.size))])
+        return rows[:steps]
+
+    def _skip_lif(self, steps):
+        lif = self.lif
+        self.V[lif] = self._lif_voltages(slice(None), [steps])[0]
+        self.out[lif] = 0
+
+    def skip(self, steps):
+        """Advance over steps in which nothing but LIF integration happens
+
+        The LIF voltages are computed in closed form and the generators
+        advance without output. Only valid for up to ``idle_steps()`` steps.
+        """
+        if steps <= 0:
+            return
+        if self.m.size:
+            self._skip_lif(steps)
+        if self.trains.size:
+            self.V[self.trains] = self.out[self.trains] = 0
+            self._train_index = self._train_index + steps
+        if self.spikers.size:
+            self.V[self.spikers] = self.out[self.spikers] = 0
+        self.t += steps
+
+    def trajectory(self, indices, steps):
+        """Voltages of the given slots during the next ``steps`` skipped steps
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (steps, len(indices)); row j holds the voltages
+            after j + 1 steps. Nodes other than LIF neurons are at 0.
+        """
+        V = np.zeros((steps, len(indices)))
+        pos = self._lif_pos[indices]
+        lif = pos >= 0
+        if lif.any():
+            V[:, lif] = self._lif_voltages(pos[lif], np.arange(1, steps + 1))
+        return V
+
+    def sync(self):
+        """Write the state of the arrays back into the node objects
+
+        Inputs that are still in flight on synapses with a delay are kept in
+        the engine only; the synapse objects are not updated.
+        """
+        for i, node in enumerate(self.units):
+            if isinstance(node, StimulusNeuron):
+                continue
+            node.V = self.V[i].item()
+            node.I = self.I[i].item()
+            node.out = self.out[i].item()
+        for k, i in enumerate(self.trains):
+            self.units[i].index = int(self._train_index[k])
+
+
+def _integral(value, name, ID):
+    if not float(value).is_integer():
+        raise ValueError(f"{name}={value} of {ID} is not an integer")
+    return abs(int(value))
+
+
+class IntegerEngine(VectorizedEngine):
+    """Vectorized engine that computes with integers only
+
+    Networks of integrate-and-fire neurons without leakage or noise and
+    with integer weights, voltages and thresholds (like the board
+    networks) can be simulated exactly with integer arithmetic. The
+    network is validated when it is compiled, and the smallest integer type
+    that can hold every reachable voltage and current (int16 or int32) is
+    chosen. Spikes are stored as bool/uint8 when every output is 0 or 1.
+    Topology edits are checked as well; the state is widened to int32 when
+    an edit needs it.
+
+    Raises
+    ------
+    ValueError
+        If the network cannot be simulated exactly with integers
+    OverflowError
+        If the voltages or currents could exceed the range of int32
+    """
+
+    name = "integer"
+
+    def __init__(self, network, rng=None):
+        state, max_out, max_in, self._binary = self._limits(network)
+        self.dtype = self._fitting_dtype(state, max_out.values(), max_in.values())
+        VectorizedEngine.__init__(self, network, rng)
+        # The limits are kept up to date when the topology is edited
+        self._state_bound = state
+        self._max_out = np.array([max_out[id(u)] for u in self.units], dtype=np.int64)
+        self._max_in = np.array([max_in.get(id(u), 0) for u in self.units], dtype=np.int64)
+
+    def _out_dtype(self):
+        return np.uint8 if self._binary else self.dtype
+
+    @staticmethod
+    def validate(network):
+        """Check that a network can be simulated with integers
+
+        Returns
+        -------
+        dtype : np.dtype
+            The integer type that is needed for the state
+        binary : bool
+            True if all nodes only ever output 0 or 1
+        """
+        bound, max_out, max_in, binary = IntegerEngine._limits(network)
+        return IntegerEngine._fitting_dtype(bound, max_out.values(), max_in.values()), binary
+
+    @staticmethod
+    def _fitting_dtype(state, max_out, max_in):
+        bound = state + max(max_in, default=0) + max(max_out, default=0)
+        for dtype in (np.int16, np.int32):
+            if bound <= np.iinfo(dtype).max:
+                return dtype
+        raise OverflowError(f"Voltages up to {bound} do not fit in 32-bit integers")
+
+    @staticmethod
+    def _limits(network):
+        """Largest state value, largest output and input per node, and whether outputs are binary"""
+
+        def integral(value, name, node):
+            return _integral(value, name, node.ID)
+
+        max_out = {}
+        bound = 0
+        for node in network.nodes:
+            if isinstance(node, LIF):
+                if node.m not in (0, 1):
+                    raise ValueError(f"Leakage m={node.m} of {node.ID} must be 0 or 1")
+                if node.noise != 0:
+                    raise ValueError(f"Neuron {node.ID} is noisy")
+                for name in ("V", "V_reset", "V_min", "thr", "I_e", "I"):
+                    bound = max(bound, integral(getattr(node, name), name, node))
+                max_out[id(node)] = integral(node.amplitude, "amplitude", node)
+            elif isinstance(node, InputTrain):
+                max_out[id(node)] = max(
+                    [integral(v, "train value", node) for v in node.train], default=0
+                )
+            elif isinstance(node, RandomSpiker):
+                max_out[id(node)] = integral(node.amplitude, "amplitude", node)
+            elif isinstance(node, StimulusPopulation):
+                low, high = node.value_range()
+                if not np.issubdtype(node.dtype, np.integer) and node.dtype != np.bool_:
+                    for value in (low, high):
+                        integral(value, "stimulus value", node)
+                for neuron in node.neurons:
+                    max_out[id(neuron)] = max(abs(int(low)), abs(int(high)))
+            else:
+                raise ValueError(f"Node type {node.__class__.__name__} is not supported")
+
+        # Largest possible input per step, per postsynaptic neuron
+        max_in = {id(node): abs(getattr(node, "I_e", 0)) for node in network.nodes}
+        for s in network.synapses:
+            w = integral(s.w, "weight", s)
+            for value in s.pending():
+                integral(value, "pending output", s)
+            max_in[id(s.post)] = max_in.get(id(s.post), 0) + w * max_out[id(s.pre)]
+        binary = all(
+            set(getattr(n, "train", [])) <= {0, 1}
+            and getattr(n, "amplitude", 1) == 1
+            and (not isinstance(n, StimulusPopulation) or set(n.value_range()) <= {0, 1})
+            for n in network.nodes
+        )
+        return bound, max_out, max_in, binary
+
+    def _require(self, bound):
+        if bound <= np.iinfo(self.dtype).max:
+            return
+        if bound > np.iinfo(np.int32).max:
+            raise OverflowError(f"Voltages up to {bound} do not fit in 32-bit integers")
+        names = ["V", "I", "ring", "w", "_train_values", "_spiker_amplitude"]
+        names += ["m", "V_reset", "V_min", "thr", "amplitude", "I_e", "noise"]
+        if not self._binary:
+            names.append("out")
+        for name in names:
+            setattr(self, name, getattr(self, name).astype(np.int32))
+        self.dtype = np.int32
+
+    def _check_weight(self, pre, post, old, new):
+        _integral(new, "weight", f"{self.units[pre].ID} -> {self.units[post].ID}")
+        max_in = int(self._max_in[post]) + (abs(int(new)) - abs(int(old))) * int(self._max_out[pre])
+        self._require(self._state_bound + max_in + int(self._max_out.max(initial=0)))
+        self._max_in[post] = max_in
+
+    def _check_neuron(self, neuron):
+        if neuron.m not in (0, 1):
+            raise ValueError(f"Leakage m={neuron.m} of {neuron.ID} must be 0 or 1")
+        if neuron.noise != 0:
+            raise ValueError(f"Neuron {neuron.ID} is noisy")
+        state = self._state_bound
+        for name in ("V", "V_reset", "V_min", "thr", "I_e", "I"):
+            state = max(state, _integral(getattr(neuron, name), name, neuron.ID))
+        amplitude = _integral(neuron.amplitude, "amplitude", neuron.ID)
+        I_e = abs(int(neuron.I_e))
+        max_in = max(int(self._max_in.max(initial=0)), I_e)
+        self._require(state + max_in + max(int(self._max_out.max(initial=0)), amplitude))
+        if self._binary and amplitude != 1:
+            self.out = self.out.astype(self.dtype)
+            self._binary = False
+        self._state_bound = state
+        self._append("_max_out", amplitude)
+        self._append("_max_in", I_e)
+
+
+class EventEngine(VectorizedEngine):
+    """Vectorized engine that keeps the input in flight in a calendar queue
+
+    The ring buffer of ``VectorizedEngine`` has a row for each of the next
+    ``max(d)`` steps. This engine stores the input in flight only for the
+    steps in which something arrives, in a dict keyed by arrival step with a
+    heap of those steps, so its memory grows with the number of spikes in
+    flight and not with the delays. When all LIF neurons are at rest (no
+    leakage, constant input or noise, and a reset below the threshold), only
+    the neurons that received input are updated, and ``idle_steps`` and
+    ``skip`` let callers jump over the steps in which nothing can happen.
+    This suits networks with long delays and sparse activity, such as the
+    graphs of ``simsnn.core.solvers``.
+
+    Parameters
+    ----------
+    network : Network
+        Network to simulate
+    rng : np.random.RandomState (Default: None)
+        Random generator for the noise and the random spikers
+    """
+
+    name = "event"
+
+    def _compile_ring(self, synapses):
+        self.ring = np.zeros((0, self.n), dtype=self.dtype)
+        self._calendar = {}
+        self._steps = []
+        times, posts, values = [], [], []
+        for s, post, w in zip(synapses, self.post, self.w):
+            for k, value in enumerate(s.pending()):
+                if value:
+                    times.append(self.t + k)
+                    posts.append(post)
+                    values.append(w * value)
+        if times:
+            self._schedule(np.array(times), np.array(posts), np.array(values, dtype=self.dtype))
+
+        self._rest = self._at_rest()
+        # LIF neurons to update in the next step; None means all of them
+        self._touched = None
+        self._fired = np.zeros(0, dtype=np.intp)
+
+    def _at_rest(self):
+        """Check whether LIF neurons without input keep their state"""
+        live = ~self.removed[self.lif]
+        m, I_e, noise = self.m[live], self.I_e[live], self.noise[live]
+        V_reset, V_min, thr = self.V_reset[live], self.V_min[live], self.thr[live]
+        return bool(
+            np.all(m == 1)
+            and np.all(I_e == 0)
+            and np.all(noise == 0)
+            and np.all(V_min <= V_reset)
+            and np.all(V_reset < thr)
+        )
+
+    def _schedule(self, times, posts, values):
+        """Add input that arrives at the end of the given steps to the calendar"""
+        order = np.argsort(times, kind="stable")
+        bounds = np.flatnonzero(np.diff(times[order])) + 1
+        for chunk in np.split(order, bounds):
+            step = int(times[chunk[0]])
+            entry = self._calendar.get(step)
+            if entry is None:
+                entry = self._calendar[step] = []
+                heapq.heappush(self._steps, step)
+            entry.append((posts[chunk], values[chunk]))
+
+    def _step_lif(self):
+        if not self._rest or self._touched is None:
+            VectorizedEngine._step_lif(self)
+            self._fired = np.flatnonzero(self.out * (self._lif_pos >= 0))
+            return
+        # Neurons at rest without input keep their state, so only the
+        # neurons that received input, and the output of the ones that
+        # spiked in the last step, need an update
+        self.out[self._fired] = 0
+        touched = self._touched
+        pos = self._lif_pos[touched]
+        V = np.maximum(self.V[touched] + self.I[touched], self.V_min[pos])
+        spikes = V >= self.thr[pos]
+        V[spikes] = self.V_reset[pos][spikes]
+        self.V[touched] = V
+        self.out[touched] = np.where(spikes, self.amplitude[pos], 0)
+        self.I[touched] = 0
+        self._fired = touched[spikes]
+
+    def _deliver(self):
+        out = self.out
+        if self._rest and self._touched is not None and self.n == self.m.size:
+            active = self._fired  # only LIF neurons, so only those that just spiked
+        else:
+            active = np.flatnonzero(out)
+        self.delivered = edges = self._outgoing(active) if active.size else _NO_EDGES
+        if edges.size:
+            values = self.w[edges] * out[self.pre[edges]]
+            self._schedule(self.t + self.d[edges] - 1, self.post[edges], values)
+        touched = np.zeros(0, dtype=np.intp)
+        arrivals = self._calendar.pop(self.t, None)
+        if arrivals is not None:
+            heapq.heappop(self._steps)
+            touched = np.concatenate([posts for posts, _ in arrivals])
+            np.add.at(self.I, touched, np.concatenate([values for _, values in arrivals]))
+        if self._rest:
+            touched = np.unique(touched)
+            self._touched = touched[(self._lif_pos[touched] >= 0) & ~self.removed[touched]]
+
+    def _input_horizon(self):
+        return self._steps[0] - self.t if self._steps else None
+
+    def _lif_horizon(self, limit=None):
+        # At rest, neurons without input never spike
+        if self._rest and self._touched is not None:
+            return 0 if self._touched.size else None
+        return VectorizedEngine._lif_horizon(self, limit)
+
+    def _skip_lif(self, steps):
+        if self._rest and self._touched is not None:
+            self.out[self._fired] = 0
+        else:
+            VectorizedEngine._skip_lif(self, steps)
+        self._fired = np.zeros(0, dtype=np.intp)
+
+    def _grow_delay(self, D):
+        self.D = D
+
+    def fork(self):
+        fork = VectorizedEngine.fork(self)
+        fork._calendar = {step: list(entry) for step, entry in self._calendar.items()}
+        fork._steps = list(self._steps)
+        return fork
+
+    def add_neuron(self, neuron):
+        slot = VectorizedEngine.add_neuron(self, neuron)
+        self._rest = self._at_rest()
+        self._touched = None
+        return slot
+
+
+class EnsembleEngine(VectorizedEngine):
+    """Vectorized engine that simulates independent realisations at once
+
+    All state arrays get a leading batch dimension of size ``nr_seeds``.
+    Noise and random spikers draw from one generator per realisation, each
+    seeded with a child of ``np.random.SeedSequence(seed)``, so realisation
+    k is reproducible and independent of the number of realisations. Input
+    trains and stimulus populations are shared by all realisations.
+
+    Parameters
+    ----------
+    network : Network
+        Network to simulate
+    nr_seeds : int
+        Number of realisations
+    seed : int or np.random.SeedSequence (Default: None)
+        Root seed of the realisations
+    """
+
+    name = "ensemble"
+
+    def __init__(self, network, nr_seeds, seed=None):
+        root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.seeds = root.spawn(nr_seeds)
+        self.generators = [np.random.default_rng(s) for s in self.seeds]
+        VectorizedEngine.__init__(self, network)
+        if self.objects.size:
+            raise ValueError("Ensembles only support LIF, InputTrain, RandomSpiker and StimulusPopulation nodes")
+        batch = (nr_seeds,)
+        self.V = np.broadcast_to(self.V, batch + self.V.shape).copy()
+        self.I = np.broadcast_to(self.I, batch + self.I.shape).copy()
+        self.out = np.broadcast_to(self.out, batch + self.out.shape).copy()
+        self.ring = np.broadcast_to(
+            self.ring[:, None], (self.D,) + batch + (self.n,)
+        ).copy()
+
+    def _uniform(self, size):
+        return np.stack([g.random(size) for g in self.generators])
+
+    def _normal(self, scale):
+        return np.stack([g.normal(scale=scale) for g in self.generators])
+
+    def sync(self):
+        """Realisations cannot be written back into a single set of node objects"""
+        pass
+
+
+ENGINES = {
+    ObjectEngine.name: ObjectEngine,
+    VectorizedEngine.name: VectorizedEngine,
+    IntegerEngine.name: IntegerEngine,
+    EventEngine.name: EventEngine,
+}
+
+
+def create_engine(engine, network, rng=None):
+    """Create an engine for a network
+
+    Parameters
+    ----------
+    engine : str or class
+        Name of a registered engine (see ``ENGINES``) or an engine class
+    network : Network
+        Network to simulate
+    rng : np.random.RandomState (Default: None)
+        Random generator for engines that do not use the nodes' generators
+    """
+    if isinstance(engine, str):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine}, choose from {list(ENGINES)}")
+        engine = ENGINES[engine]
+    return engine(network, rng)
@@ -0,0 +1,183 @@
+import pickle
+import sys
+
+import numpy as np
+
+
+def _slot_values(obj):
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, "__slots__", ()):
+            if name != "__weakref__" and hasattr(obj, name):
+                yield name, getattr(obj, name)
+    yield from getattr(obj, "__dict__", {}).items()
+
+
+def deep_sizeof(obj, seen=None):
+    """Number of bytes used by an object and everything it refers to
+
+    Objects in ``seen`` (a set of ids) are not counted again, so shared
+    objects are counted once over several calls. Arrays count their data
+    buffer; random generators count their pickled state.
+    """
+    seen = set() if seen is None else seen
+    stack = [obj]
+    size = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or obj is None or isinstance(obj, (type, bool)):
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, np.ndarray):
+            size += sys.getsizeof(obj) if obj.base is None else obj.__sizeof__()
+            if obj.base is not None and id(obj.base) not in seen:
+                stack.append(obj.base)
+        elif isinstance(obj, (np.random.RandomState, np.random.Generator)):
+            size += rng_sizeof(obj)
+        elif isinstance(obj, dict):
+            size += sys.getsizeof(obj)
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            size += sys.getsizeof(obj)
+            stack.extend(obj)
+        else:
+            size += sys.getsizeof(obj)
+            stack.extend(value for _, value in _slot_values(obj))
+    return size
+
+
+_rng_sizes = {}
+
+
+def rng_sizeof(rng):
+    """Approximate size of a random generator, measured once per type"""
+    cls = type(rng)
+    if cls not in _rng_sizes:
+        _rng_sizes[cls] = sys.getsizeof(rng) + len(pickle.dumps(rng.__getstate__()))
+    return _rng_sizes[cls]
+
+
+def network_memory(network):
+    """Memory used by a network, per component category and per node type
+
+    Every object is counted once, in the first category it is found in.
+
+    Parameters
+    ----------
+    network : Network
+        Network to measure
+
+    Returns
+    -------
+    dict
+        Bytes per category: ``nodes`` (the node objects and their own
+        values), ``parameters`` (shared ``LIFParameters``), ``rng`` (random
+        generators of the nodes), ``stimulus`` (arrays of stimulus
+        populations), ``synapses`` (the synapse objects),
+        ``synapse_buffers`` (outputs in flight on synapses with a delay),
+        ``graph`` (the networkx graph) and ``total``. ``by_type`` maps every
+        node type to its ``count`` and ``bytes`` (all categories of its
+        nodes except the shared parameters).
+    """
+    seen = set()
+    report = dict.fromkeys(
+        ("nodes", "parameters", "rng", "stimulus", "synapses", "synapse_buffers", "graph"), 0
+    )
+    by_type = {}
+
+    # Shared objects first, so that they are not attributed to one node
+    for node in network.nodes:
+        params = getattr(node, "params", None)
+        if params is not None and id(params) not in seen:
+            report["parameters"] += deep_sizeof(params, seen)
+    for node in network.nodes:
+        entry = by_type.setdefault(type(node).__name__, {"count": 0, "bytes": 0})
+        entry["count"] += getattr(node, "size", 1) if hasattr(node, "neurons") else 1
+        rng = getattr(node, "_rng", None)
+        rng_bytes = deep_sizeof(rng, seen) if rng is not None else 0
+        report["rng"] += rng_bytes
+        if hasattr(node, "neurons"):
+            stimulus = deep_sizeof(node, seen)
+            report["stimulus"] += stimulus
+            entry["bytes"] += stimulus
+        else:
+            own = deep_sizeof(node, seen)
+            report["nodes"] += own
+            entry["bytes"] += own + rng_bytes
+
+    for synapse in network.synapses:
+        buffer = getattr(synapse, "_buffer", None)
+        if buffer is not None:
+            report["synapse_buffers"] += deep_sizeof(buffer, seen)
+        report["synapses"] += deep_sizeof(synapse, seen)
+
+    report["graph"] = deep_sizeof(network.graph, seen)
+    report["total"] = sum(report.values())
+    report["by_type"] = by_type
+    return report
+
+
+def engine_memory(engine):
+    """Bytes held by the arrays and tables of a compiled engine
+
+    The node objects of the network are not included. Engines that step the
+    node objects directly use no memory of their own.
+    """
+    if not hasattr(engine, "units"):
+        return 0
+    seen = {id(engine.network), id(engine.units), id(engine.nodes)}
+    seen.update(id(unit) for unit in engine.units)
+    return deep_sizeof(engine, seen)
+
+
+def estimate_engine_memory(network, engine):
+    """Projected size of the arrays of an engine before it is compiled
+
+    Parameters
+    ----------
+    network : Network
+        Network to compile
+    engine : str
+        Name of the engine
+
+    Returns
+    -------
+    int
+        Estimated number of bytes (0 for the object engine)
+    """
+    if engine == "object":
+        return 0
+    itemsize = 4 if engine == "integer" else 8
+    n = sum(getattr(node, "size", 1) if hasattr(node, "neurons") else 1 for node in network.nodes)
+    S = len(network.synapses)
+    D = max((s.d for s in network.synapses), default=1)
+    index = np.dtype(np.intp).itemsize
+    # State and parameters per node, four index arrays, weights and masks
+    # per synapse, and the ring buffer (the event engine has none)
+    ring = 0 if engine == "event" else D * n * itemsize
+    return n * (10 * itemsize + 2 + index) + S * (4 * index + itemsize + 1) + ring
+
+
+def detector_memory(detectors, steps):
+    """Projected memory of detectors that record for a number of steps
+
+    Parameters
+    ----------
+    detectors : list
+        Detectors with a ``memory(steps)`` method (others count as 0)
+    steps : int
+        Number of steps to record
+
+    Returns
+    -------
+    dict
+        Bytes per detector, keyed by its class name (and ID, if it has one)
+    """
+    report = {}
+    for detector in detectors:
+        key = type(detector).__name__
+        if getattr(detector, "ID", None) is not None:
+            key += f" {detector.ID}"
+        memory = getattr(detector, "memory", None)
+        report[key] = report.get(key, 0) + (memory(steps) if memory is not None else 0)
+    return report
@@ -1,7 +1,8 @@
 import networkx as nx
 
-from simsnn.core.nodes import LIF, InputTrain, RandomSpiker
+from simsnn.core.nodes import LIF, InputTrain, RandomSpiker, StimulusPopulation
 from simsnn.core.connections import Synapse
+from simsnn.core.memory import network_memory
 
 
 class Network:
@@ -13,12 +14,19 @@ class Network:
         List of nodes in the network
     synapses : list
         List of synapses connecting nodes
+
+    Attributes
+    ----------
+    version : int
+        Counter that is increased whenever nodes or synapses are added or
+        removed, so that compiled versions of the network can be refreshed
     """
 
     def __init__(self, nodes=None, synapses=None):
         self.nodes = nodes if nodes is not None else []
         self.synapses = synapses if synapses is not None else []
         self.graph = nx.DiGraph()
+        self.version = 0
 
     def createLIF(
         self,
@@ -49,12 +57,34 @@ class Network:
             increment_count,
         )
         self.nodes.append(node)
+        self.version += 1
         return node
 
     def createInputTrain(self, train, loop, ID=None, increment_count=True):
         self.graph.add_node(ID)
         node = InputTrain(train, loop, ID, increment_count)
         self.nodes.append(node)
+        self.version += 1
+        return node
+
+    def createStimulusPopulation(
+        self,
+        size,
+        stimulus=None,
+        events=None,
+        periods=None,
+        chunks=None,
+        length=None,
+        dtype=None,
+        ID=None,
+        increment_count=True,
+    ):
+        node = StimulusPopulation(
+            size, stimulus, events, periods, chunks, length, dtype, ID, increment_count
+        )
+        self.graph.add_nodes_from(neuron.ID for neuron in node.neurons)
+        self.nodes.append(node)
+        self.version += 1
         return node
 
     def createRandomSpiker(
@@ -62,14 +92,41 @@ class Network:
     ):
         node = RandomSpiker(p, amplitude, rng, ID, increment_count)
         self.nodes.append(node)
+        self.version += 1
         return node
 
-    def createSynapse(self, pre, post, w=1.0, d=1, ID=None, increment_count=True):
+    def createSynapse(self, pre, post, w=1.0, d=1, ID=None, increment_count=True, meta=None):
         self.graph.add_edge(pre.ID, post.ID)
-        synapse = Synapse(pre, post, w, d, ID, increment_count)
+        synapse = Synapse(pre, post, w, d, ID, increment_count, meta)
         self.synapses.append(synapse)
+        self.version += 1
         return synapse
 
+    def removeSynapse(self, synapse):
+        self.synapses.remove(synapse)
+        if not any(s.pre is synapse.pre and s.post is synapse.post for s in self.synapses):
+            self.graph.remove_edge(synapse.pre.ID, synapse.post.ID)
+        self.version += 1
+
+    def removeNode(self, node):
+        """Remove a node together with all its synapses"""
+        units = {id(u) for u in getattr(node, "neurons", [node])}
+        self.synapses = [
+            s for s in self.synapses if id(s.pre) not in units and id(s.post) not in units
+        ]
+        self.nodes.remove(node)
+        for unit in getattr(node, "neurons", [node]):
+            if unit.ID in self.graph:
+                self.graph.remove_node(unit.ID)
+        self.version += 1
+
+    def memory_report(self):
+        """Bytes used per component category and per node type
+
+        See ``simsnn.core.memory.network_memory``.
+        """
+        return network_memory(self)
+
     def step(self):
         for node in self.nodes:  # update all nodes
             node.step()
@@ -1,3 +1,7 @@
+import itertools
+import sys
+import weakref
+
 import numpy as np
 
 """
@@ -5,6 +9,11 @@ neurons
 """
 
 
+def intern_id(ID):
+    """Intern string IDs, so that equal IDs share a single string object"""
+    return sys.intern(ID) if type(ID) is str else ID
+
+
 class AbstractNeuron:
     """Abstract class for a neuron
 
@@ -16,6 +25,8 @@ class AbstractNeuron:
         Current neuron output
     """
 
+    __slots__ = ("I", "out", "V", "ID")
+
     def __init__(self, amplitude=1):
         self.amplitude = amplitude
         self.I = 0
@@ -23,10 +34,66 @@ class AbstractNeuron:
         self.V = 0
 
     def update_rng(self, rng):
-        if hasattr(self, "rng"):
+        if hasattr(type(self), "rng"):
             self.rng = rng
 
 
+class LIFParameters:
+    """Parameter set that is shared by all LIF neurons with equal parameters
+
+    Parameter sets are immutable and interned: creating a parameter set
+    that equals an existing one returns the existing object, so a network
+    of identical neurons stores its parameters only once.
+
+    Parameters
+    ----------
+    m, V_reset, V_min, thr, amplitude, I_e, noise
+        See ``LIF``
+    """
+
+    __slots__ = ("m", "V_reset", "V_min", "thr", "amplitude", "I_e", "noise", "__weakref__")
+    _interned = weakref.WeakValueDictionary()
+
+    def __new__(cls, m=1.0, V_reset=0, V_min=0, thr=1, amplitude=1, I_e=0, noise=0):
+        values = (m, V_reset, V_min, thr, amplitude, I_e, noise)
+        # The types are part of the key, so that 1 and 1.0 stay distinguishable
+        key = tuple((type(v), v) for v in values)
+        try:
+            params = cls._interned.get(key)
+        except TypeError:  # unhashable parameter values cannot be shared
+            key, params = None, None
+        if params is None:
+            params = object.__new__(cls)
+            for name, value in zip(cls.__slots__, values):
+                object.__setattr__(params, name, value)
+            if key is not None:
+                cls._interned[key] = params
+        return params
+
+    def __setattr__(self, name, value):
+        raise AttributeError("LIFParameters are immutable, use replace() instead")
+
+    def __reduce__(self):
+        return LIFParameters, tuple(getattr(self, name) for name in self.__slots__[:-1])
+
+    def replace(self, **changes):
+        """Return the parameter set with the given parameters changed"""
+        values = {name: getattr(self, name) for name in self.__slots__[:-1]}
+        values.update(changes)
+        return LIFParameters(**values)
+
+
+def _shared_parameter(name):
+    def get(self):
+        return getattr(self.params, name)
+
+    def set(self, value):
+        if getattr(self.params, name) != value or type(getattr(self.params, name)) is not type(value):
+            self.params = self.params.replace(**{name: value})
+
+    return property(get, set, doc=f"Shared parameter {name}, see LIFParameters")
+
+
 class LIF(AbstractNeuron):
     """Leaky integrate-and-fire based on the Sandia model
 
@@ -48,11 +115,24 @@ class LIF(AbstractNeuron):
         Standard deviation of the normal distribution that is sampled from
         to add noise to the membrane voltage at each step
     rng : np.random.RandomState
-        Random generator for the noise
+        Random generator for the noise. If not given, a private generator is
+        created the first time it is needed.
+
+    All parameters except V_init and rng are stored in a shared
+    ``LIFParameters`` object (``params``).
     """
 
+    __slots__ = ("params", "_rng")
     count = 0
 
+    m = _shared_parameter("m")
+    V_reset = _shared_parameter("V_reset")
+    V_min = _shared_parameter("V_min")
+    thr = _shared_parameter("thr")
+    amplitude = _shared_parameter("amplitude")
+    I_e = _shared_parameter("I_e")
+    noise = _shared_parameter("noise")
+
     def __init__(
         self,
         m=1.0,
@@ -67,33 +147,39 @@ class LIF(AbstractNeuron):
         ID=None,
         increment_count=True,
     ):
+        self.params = LIFParameters(m, V_reset, V_min, thr, amplitude, I_e, noise)
         AbstractNeuron.__init__(self, amplitude)
-        self.m = m
         self.V = V_init
-        self.V_reset = V_reset
-        self.V_min = V_min
-        self.thr = thr
-        self.I_e = I_e
         self.I = I_e
-        self.rng = rng if rng is not None else np.random.RandomState()
-        self.noise = noise
+        self._rng = rng
 
         if ID is None:
             self.ID = LIF.count + 1
         else:
-            self.ID = ID
+            self.ID = intern_id(ID)
         if increment_count:
             LIF.count += 1
 
+    @property
+    def rng(self):
+        if self._rng is None:
+            self._rng = np.random.RandomState()
+        return self._rng
+
+    @rng.setter
+    def rng(self, rng):
+        self._rng = rng
+
     def step(self):
-        self.V = self.V * self.m + self.I  # update V
-        if self.noise > 0:
-            self.V += self.rng.normal(scale=self.noise)  # add noise
-        self.V = max(self.V_min, self.V)
-        self.I = self.I_e  # reset I with I_e
-        if self.V >= self.thr:  # check for spike
-            self.V = self.V_reset
-            self.out = self.amplitude
+        p = self.params
+        self.V = self.V * p.m + self.I  # update V
+        if p.noise > 0:
+            self.V += self.rng.normal(scale=p.noise)  # add noise
+        self.V = max(p.V_min, self.V)
+        self.I = p.I_e  # reset I with I_e
+        if self.V >= p.thr:  # check for spike
+            self.V = p.V_reset
+            self.out = p.amplitude
         else:
             self.out = 0
 
@@ -169,6 +255,7 @@ class InputTrain(AbstractNeuron):
         If true, the train will be looped. Otherwise, the output is 0 at the end of the train.
     """
 
+    __slots__ = ("amplitude", "train", "loop", "size", "index")
     count = 0
 
     def __init__(self, train, loop, ID=None, increment_count=True):
@@ -181,7 +268,7 @@ class InputTrain(AbstractNeuron):
         if ID is None:
             self.ID = InputTrain.count + 1
         else:
-            self.ID = ID
+            self.ID = intern_id(ID)
         if increment_count:
             InputTrain.count += 1
 
@@ -212,6 +299,259 @@ class InputTrain(AbstractNeuron):
         )
 
 
+class StimulusNeuron:
+    """Single neuron of a StimulusPopulation
+
+    Stimulus neurons are used like any other node as the presynaptic node of
+    a synapse or as a detector target. Their output is read from the
+    population.
+    """
+
+    __slots__ = ("population", "k", "ID", "I")
+
+    def __init__(self, population, k, ID):
+        self.population = population
+        self.k = k
+        self.ID = intern_id(ID)
+        self.I = 0
+
+    @property
+    def out(self):
+        return self.population.out[self.k].item()
+
+    @property
+    def V(self):
+        return self.out
+
+
+class StimulusPopulation:
+    """Generator for a population of input neurons
+
+    The stimulus of the whole population is stored as a matrix of shape
+    (steps, size) (``stimulus``, e.g. uint8), or as sparse events
+    (``events``), and a whole step is produced at once as one array. Neurons
+    can loop their part of the stimulus with their own period. Instead of
+    a complete stimulus, ``chunks`` can be an iterable (e.g. a generator)
+    that yields successive parts of the stimulus, so that long stimuli are
+    never held in memory completely.
+
+    The neurons of the population are ``population.neurons`` (or
+    ``population[k]``), and are used as presynaptic nodes and detector targets.
+
+    Parameters
+    ----------
+    size : int
+        Number of neurons
+    stimulus : array_like (Default: None)
+        Dense stimulus of shape (steps, size)
+    events : tuple (Default: None)
+        Sparse stimulus as (times, neurons) or (times, neurons, values); the
+        values default to 1
+    periods : int or array_like (Default: None)
+        Loop period of every neuron. A period of 0 (or None) means that the
+        neuron outputs 0 after the end of the stimulus. Neurons whose period
+        exceeds the length of the stimulus are silent in between.
+    chunks : iterable (Default: None)
+        Parts of the stimulus, either dense arrays of shape (steps, size) or
+        sparse (length, times, neurons, values) tuples with times relative
+        to the start of the chunk. Chunks cannot be looped.
+    length : int (Default: None)
+        Number of steps of a sparse stimulus (Default: last event time + 1)
+    dtype : np.dtype (Default: None)
+        Type of the output (Default: the type of the stimulus, or uint8 for
+        chunks)
+    """
+
+    __slots__ = (
+        "size", "ID", "neurons", "out", "dtype", "t", "_groups", "_dense", "_sparse",
+        "_length", "_start", "_last", "_chunks",
+    )
+    count = 0
+
+    def __init__(
+        self,
+        size,
+        stimulus=None,
+        events=None,
+        periods=None,
+        chunks=None,
+        length=None,
+        dtype=None,
+        ID=None,
+        increment_count=True,
+    ):
+        if (stimulus is not None) + (events is not None) + (chunks is not None) != 1:
+            raise ValueError("Give exactly one of stimulus, events or chunks")
+        if chunks is not None and periods is not None:
+            raise ValueError("A stimulus that is given in chunks cannot be looped")
+
+        if ID is None:
+            self.ID = StimulusPopulation.count + 1
+        else:
+            self.ID = intern_id(ID)
+        if increment_count:
+            StimulusPopulation.count += 1
+
+        self.size = size
+        self.neurons = [StimulusNeuron(self, k, f"{self.ID}-{k}") for k in range(size)]
+        self.t = 0
+        self._start = 0
+        self._last = np.zeros(0, dtype=np.intp)
+        self._dense = self._sparse = None
+        self._chunks = None
+
+        if chunks is not None:
+            self.dtype = np.dtype(dtype if dtype is not None else np.uint8)
+            self._chunks = iter(chunks)
+            self._length = 0
+        else:
+            if stimulus is not None:
+                stimulus = np.asarray(stimulus, dtype=dtype)
+                self.dtype = stimulus.dtype
+            else:
+                values = events[2] if len(events) > 2 else np.ones(len(events[0]), dtype=np.uint8)
+                self.dtype = np.dtype(dtype if dtype is not None else np.asarray(values).dtype)
+            self._load(stimulus, events, length)
+        self.out = np.zeros(size, dtype=self.dtype)
+
+        # Neurons with the same period are produced together
+        periods = np.zeros(size, dtype=np.intp) if periods is None else np.broadcast_to(periods, (size,))
+        distinct = np.unique(periods)
+        if distinct.size == 1:
+            self._groups = [(int(distinct[0]), slice(None))]
+        else:
+            self._groups = [(int(p), np.flatnonzero(periods == p)) for p in distinct]
+        if self._sparse is not None and len(self._groups) > 1:
+            indptr, neurons, values = self._sparse
+            rows = np.repeat(np.arange(self._length), np.diff(indptr))
+            self._sparse = {}
+            for period, index in self._groups:
+                mask = np.isin(neurons, index)
+                self._sparse[period] = self._csr(rows[mask], neurons[mask], values[mask])
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, k):
+        return self.neurons[k]
+
+    def _csr(self, times, neurons, values):
+        order = np.argsort(times, kind="stable")
+        indptr = np.searchsorted(np.asarray(times)[order], np.arange(self._length + 1))
+        return (
+            indptr,
+            np.asarray(neurons, dtype=np.intp)[order],
+            np.asarray(values, dtype=self.dtype)[order],
+        )
+
+    def _load(self, stimulus, events, length):
+        if stimulus is not None:
+            if stimulus.ndim != 2 or stimulus.shape[1] != self.size:
+                raise ValueError(f"Stimulus must have shape (steps, {self.size})")
+            self._dense, self._sparse = stimulus.astype(self.dtype, copy=False), None
+            self._length = stimulus.shape[0]
+        else:
+            times = np.asarray(events[0], dtype=np.intp)
+            neurons = np.asarray(events[1], dtype=np.intp)
+            values = events[2] if len(events) > 2 else np.ones(times.size, dtype=self.dtype)
+            self._length = length if length is not None else int(times.max(initial=-1)) + 1
+            self._dense = None
+            self._sparse = self._csr(times, neurons, values)
+
+    def _next_chunk(self):
+        self._start += self._length
+        self.out[:] = 0
+        self._last = np.zeros(0, dtype=np.intp)
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._chunks = None
+            self._dense, self._sparse, self._length = None, None, 0
+        elif isinstance(chunk, tuple):
+            self._load(None, chunk[1:], chunk[0])
+        else:
+            self._load(np.asarray(chunk), None, None)
+
+    def value_range(self):
+        """Bounds of the output: the exact range, or the range of the dtype for chunks"""
+        if self._chunks is not None:
+            if np.issubdtype(self.dtype, np.integer):
+                info = np.iinfo(self.dtype)
+                return info.min, info.max
+            if self.dtype == np.bool_:
+                return 0, 1
+            return -np.inf, np.inf
+        if self._dense is not None:
+            values = self._dense
+        elif self._sparse is not None:
+            parts = self._sparse.values() if isinstance(self._sparse, dict) else [self._sparse]
+            values = np.concatenate([part[2] for part in parts] + [np.zeros(1, self.dtype)])
+        else:
+            values = np.zeros(1)
+        return values.min(initial=0), values.max(initial=0)
+
+    def step(self):
+        while self._chunks is not None and self.t - self._start >= self._length:
+            self._next_chunk()
+
+        out = self.out
+        if self._sparse is not None:
+            out[self._last] = 0
+        r = self.t - self._start
+        last = []
+        for period, index in self._groups:
+            row = r % period if period else r
+            if self._dense is not None:
+                out[index] = self._dense[row, index] if row < self._length else 0
+            elif self._sparse is not None:
+                indptr, neurons, values = (
+                    self._sparse[period] if isinstance(self._sparse, dict) else self._sparse
+                )
+                if row < self._length:
+                    events = slice(indptr[row], indptr[row + 1])
+                    out[neurons[events]] = values[events]
+                    last.append(neurons[events])
+            else:
+                out[index] = 0
+        if self._sparse is not None:
+            self._last = np.concatenate(last) if last else np.zeros(0, dtype=np.intp)
+        self.t += 1
+
+    def snapshot(self):
+        """Playback state, to be given to ``restore``
+
+        Chunks that are read after the snapshot are kept, so that they can
+        be played again after a restore.
+        """
+        if self._chunks is not None:
+            self._chunks, chunks = itertools.tee(self._chunks)
+        else:
+            chunks = None
+        return (
+            self.t, self._start, self._length, self._last, self._dense, self._sparse,
+            chunks, self.out.copy(),
+        )
+
+    def restore(self, snapshot):
+        """Return to the playback state of a ``snapshot``"""
+        (self.t, self._start, self._length, self._last, self._dense, self._sparse,
+         self._chunks, out) = snapshot
+        # Engines may hold on to the output array
+        self.out[:] = out
+
+    def update_rng(self, rng):
+        pass
+
+    def to_inet_string(self):
+        return (
+            self.__class__.__name__ + "_" + str(self.ID) + " = "
+            "network.create"
+            + self.__class__.__name__
+            + "("
+            + str(self.size)
+            + ")"
+        )
+
+
 '''class PoissonGenerator(AbstractNeuron):
     """Generator that fires with Poisson statistics, i.e. exponentially
     distributed interspike intervals.
@@ -252,23 +592,35 @@ class RandomSpiker(AbstractNeuron):
     amplitude : float (Default: 1)
         Amplitude of the output
     rng : np.random.RandomState
-        Random generator
+        Random generator. If not given, a private generator is created the
+        first time it is needed.
     """
 
+    __slots__ = ("amplitude", "p", "_rng")
     count = 0
 
     def __init__(self, p, amplitude=1, rng=None, ID=None, increment_count=True):
         AbstractNeuron.__init__(self, amplitude)
         self.p = p
-        self.rng = rng if rng is not None else np.random.default_rng()
+        self._rng = rng
 
         if ID is None:
             self.ID = RandomSpiker.count + 1
         else:
-            self.ID = ID
+            self.ID = intern_id(ID)
         if increment_count:
             RandomSpiker.count += 1
 
+    @property
+    def rng(self):
+        if self._rng is None:
+            self._rng = np.random.default_rng()
+        return self._rng
+
+    @rng.setter
+    def rng(self, rng):
+        self._rng = rng
+
     def step(self):
         self.V = 0
         if self.rng.random() < self.p:
@@ -0,0 +1,131 @@
+import networkx as nx
+
+from simsnn.core.nodes import LIF, RandomSpiker
+
+
+def is_source(node):
+    """Check whether a node can spike without receiving synaptic input
+
+    Generators always count as sources. A LIF neuron is a source if it has
+    a constant or pending input current, noise, or a voltage that reaches
+    the threshold on its own.
+    """
+    if not isinstance(node, LIF):
+        return True
+    return (
+        node.I != 0
+        or node.I_e != 0
+        or node.noise > 0
+        or max(node.V * node.m, node.V_reset * node.m, node.V_min) >= node.thr
+    )
+
+
+def optimize_network(network, targets, protected=None, merge=True):
+    """Shrink a network without changing the behaviour of its targets
+
+    Neurons that can never spike (no source upstream) and neurons that
+    cannot influence any target are removed, together with their synapses.
+    Parallel synapses between the same pair of neurons with the same delay
+    are merged into one synapse that carries the summed weight, unless they
+    have a ``meta`` label, which a merged synapse could not keep. Neurons
+    and the remaining synapses keep their objects and IDs, so detectors and
+    labels that refer to them stay valid.
+
+    Parameters
+    ----------
+    network : Network
+        Network to optimize in place
+    targets : list
+        Nodes that are recorded; every kept node must be able to reach one
+    protected : list (Default: None)
+        Nodes that are never removed, e.g. multimeter targets
+    merge : bool (Default: True)
+        If true, parallel synapses are merged
+
+    Returns
+    -------
+    dict
+        ``removed_nodes``: list of the removed nodes,
+        ``removed_synapses``: list of the synapses that were dropped because
+        one of their neurons was removed,
+        ``merged_synapses``: dict mapping the ID of every kept synapse to the
+        IDs of the synapses that were merged into it
+    """
+    protected = {id(n) for n in protected} if protected is not None else set()
+    # The neurons of a population are handled one by one
+    units = [u for n in network.nodes for u in getattr(n, "neurons", [n])]
+    outgoing = {id(n): [] for n in units}
+    incoming = {id(n): [] for n in units}
+    pending = set()
+    for s in network.synapses:
+        outgoing[id(s.pre)].append(s)
+        incoming[id(s.post)].append(s)
+        if any(s.pending()):
+            pending.add(id(s.post))
+
+    # Forward pass: everything downstream of a source can receive input
+    live = set()
+    stack = [n for n in units if is_source(n) or id(n) in pending]
+    while stack:
+        node = stack.pop()
+        if id(node) in live:
+            continue
+        live.add(id(node))
+        stack.extend(s.post for s in outgoing[id(node)])
+
+    # Backward pass: everything upstream of a target can influence it
+    useful = set()
+    stack = list(targets)
+    while stack:
+        node = stack.pop()
+        if id(node) in useful:
+            continue
+        useful.add(id(node))
+        stack.extend(s.pre for s in incoming[id(node)])
+
+    keep = (live & useful) | protected
+    # A population is kept as a whole when any of its neurons is needed
+    for n in network.nodes:
+        if hasattr(n, "neurons") and any(id(u) in keep for u in n.neurons):
+            keep.add(id(n))
+            keep.update(id(u) for u in n.neurons)
+    removed_nodes = [n for n in network.nodes if id(n) not in keep]
+    network.nodes = [n for n in network.nodes if id(n) in keep]
+    removed_synapses = [
+        s for s in network.synapses if id(s.pre) not in keep or id(s.post) not in keep
+    ]
+    synapses = [
+        s for s in network.synapses if id(s.pre) in keep and id(s.post) in keep
+    ]
+
+    merged_synapses = {}
+    if merge:
+        groups = {}
+        for s in synapses:
+            pending = s.pending()
+            key = (id(s.pre), id(s.post), s.d, tuple(pending) if any(pending) else ())
+            if s.meta is not None:
+                key = id(s)
+            groups.setdefault(key, []).append(s)
+        synapses = []
+        for group in groups.values():
+            kept = group[0]
+            if len(group) > 1:
+                kept.w = sum(s.w for s in group)
+                merged_synapses[kept.ID] = [s.ID for s in group[1:]]
+            synapses.append(kept)
+    network.synapses = synapses
+    network.version += 1
+
+    network.graph = nx.DiGraph()
+    for n in units:
+        if id(n) in keep and not isinstance(n, RandomSpiker):
+            network.graph.add_node(n.ID)
+    for s in network.synapses:
+        network.graph.add_edge(s.pre.ID, s.post.ID)
+
+    return {
+        "removed_nodes": removed_nodes,
+        "removed_synapses": removed_synapses,
+        "merged_synapses": merged_synapses,
+    }
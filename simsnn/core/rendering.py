@@ -0,0 +1,177 @@
+import time
+
+import numpy as np
+import matplotlib.ticker as ticker
+import networkx as nx
+from matplotlib.figure import Figure
+
+
+def aggregate(data, max_rows, max_cols):
+    """Average a matrix over blocks, so that it has at most max_rows x max_cols entries
+
+    Parameters
+    ----------
+    data : np.ndarray
+        Matrix of shape (rows, cols)
+    max_rows, max_cols : int
+        Maximum shape of the result
+
+    Returns
+    -------
+    np.ndarray
+        Block means (for a boolean raster: the spike density per bin)
+    row_bin, col_bin : int
+        Number of rows and columns of data per block
+    """
+    rows, cols = data.shape
+    row_bin = max(1, -(-rows // max_rows))
+    col_bin = max(1, -(-cols // max_cols))
+    if row_bin == 1 and col_bin == 1:
+        return data, 1, 1
+    # Sum the blocks in place of a padded float copy of the raster; booleans
+    # are counted in integers, as adding booleans is a logical or
+    dtype = data.dtype if data.dtype.kind in "fc" else np.int64
+    row_starts = np.arange(0, rows, row_bin)
+    col_starts = np.arange(0, cols, col_bin)
+    sums = data
+    if row_bin > 1:
+        sums = np.add.reduceat(sums, row_starts, axis=0, dtype=dtype)
+    if col_bin > 1:
+        sums = np.add.reduceat(sums, col_starts, axis=1, dtype=dtype)
+    # Only the last block of a row or column can be smaller than a bin
+    counts = np.outer(
+        np.diff(np.append(row_starts, rows)), np.diff(np.append(col_starts, cols))
+    )
+    return sums / counts, row_bin, col_bin
+
+
+def render_detectors(
+    sim,
+    path,
+    graph=True,
+    max_graph_nodes=100,
+    max_raster_bins=(1000, 500),
+    max_traces=8,
+    max_trace_points=5000,
+    time_budget=None,
+    dpi=100,
+):
+    """Render the detectors of a simulator to an image file
+
+    The figure is drawn without pyplot, so no interactive backend is needed
+    and nothing blocks. Large recordings are reduced before they are drawn:
+    rasters above ``max_raster_bins`` are shown as spike density per
+    (time, target) bin, only ``max_traces`` evenly spaced multimeter targets
+    are drawn, each with at most ``max_trace_points`` points, and graphs
+    with more than ``max_graph_nodes`` nodes are not drawn.
+
+    Parameters
+    ----------
+    sim : Simulator
+        Simulator whose raster, multimeter and network are drawn
+    path : str
+        File to write; the format follows from the extension
+    graph : bool (Default: True)
+        If true, the network graph is drawn
+    max_graph_nodes : int (Default: 100)
+        Largest graph that is drawn
+    max_raster_bins : tuple (Default: (1000, 500))
+        Maximum number of (time, target) bins of the raster image
+    max_traces : int (Default: 8)
+        Maximum number of voltage traces
+    max_trace_points : int (Default: 5000)
+        Maximum number of points per voltage trace
+    time_budget : float (Default: None)
+        Seconds after which no further panels are drawn. The budget is
+        checked before every panel and after the raster is aggregated, so a
+        panel that is being drawn is finished, and writing the file is not
+        counted. The file is always written, with a note in the panels that
+        were skipped.
+    dpi : int (Default: 100)
+        Resolution of the image
+
+    Returns
+    -------
+    dict
+        Summary of what was drawn: ``graph`` ("drawn", "too large",
+        "disabled" or "over budget"), ``raster_bins`` (time and target bin
+        sizes, or None), ``traces`` (the drawn multimeter target indices)
+    """
+    start = time.perf_counter()
+
+    def over_budget():
+        return time_budget is not None and time.perf_counter() - start > time_budget
+
+    rasterdata = sim.raster.get_measurements() if sim.raster.targets else None
+    multimeterdata = sim.multimeter.get_measurements() if sim.multimeter.targets else None
+    nvd = 0 if multimeterdata is None else multimeterdata.shape[1]
+    traces = np.unique(np.linspace(0, nvd - 1, min(nvd, max_traces)).astype(int)) if nvd else []
+
+    nrows = int(graph) + int(rasterdata is not None) + len(traces)
+    fig = Figure(figsize=(14, max(4, 2 * nrows)), constrained_layout=True, dpi=dpi)
+    axes = list(np.atleast_1d(fig.subplots(nrows=max(nrows, 1))))
+    summary = {"graph": "disabled", "raster_bins": None, "traces": []}
+
+    def skip(ax, message):
+        ax.text(0.5, 0.5, message, ha="center", va="center", transform=ax.transAxes)
+        ax.set_axis_off()
+
+    if graph:
+        ax = axes.pop(0)
+        n = sim.network.graph.number_of_nodes()
+        if n > max_graph_nodes:
+            summary["graph"] = "too large"
+            skip(ax, f"Graph with {n} nodes not drawn (limit {max_graph_nodes})")
+        elif over_budget():
+            summary["graph"] = "over budget"
+            skip(ax, "Graph not drawn (time budget exceeded)")
+        else:
+            summary["graph"] = "drawn"
+            nx.draw_networkx(
+                sim.network.graph,
+                pos=nx.circular_layout(sim.network.graph),
+                ax=ax,
+                with_labels=True,
+                node_color="white",
+                edgecolors="blue",
+                node_size=1100 if n <= 30 else 300,
+            )
+
+    if rasterdata is not None:
+        ax = axes.pop(0)
+        image = None
+        if not over_budget():
+            image, time_bin, target_bin = aggregate(rasterdata, *max_raster_bins)
+        # Aggregating a long raster can take a while by itself
+        if image is None or over_budget():
+            skip(ax, "Raster not drawn (time budget exceeded)")
+        else:
+            summary["raster_bins"] = (time_bin, target_bin)
+            ax.matshow(image.T, cmap="gray", aspect="auto", interpolation="nearest")
+            ax.xaxis.set_major_locator(ticker.MaxNLocator(20, integer=True))
+            ax.xaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: int(x * time_bin)))
+            if target_bin == 1 and image.shape[1] <= 30:
+                ax.set_yticks(np.arange(image.shape[1]))
+                ax.set_yticklabels(sim.raster.get_labels())
+            else:
+                ax.yaxis.set_major_locator(ticker.MaxNLocator(10, integer=True))
+                ax.yaxis.set_major_formatter(ticker.FuncFormatter(lambda y, _: int(y * target_bin)))
+            if time_bin > 1 or target_bin > 1:
+                ax.set_title(f"Spike density per {time_bin} steps x {target_bin} targets")
+
+    labels = sim.multimeter.get_labels()
+    for i in traces:
+        ax = axes.pop(0)
+        if over_budget():
+            skip(ax, f"Trace of {labels[i]} not drawn (time budget exceeded)")
+            continue
+        stride = max(1, -(-multimeterdata.shape[0] // max_trace_points))
+        x = np.arange(0, multimeterdata.shape[0], stride)
+        ax.plot(x, multimeterdata[::stride, i])
+        ax.set_ylabel(labels[i])
+        ax.grid(which="major")
+        ax.xaxis.set_major_locator(ticker.MaxNLocator(20, integer=True))
+        summary["traces"].append(int(i))
+
+    fig.savefig(path)
+    return summary
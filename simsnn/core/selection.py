@@ -0,0 +1,207 @@
+import hashlib
+
+import numpy as np
+
+from simsnn.core.engines import EventEngine, IntegerEngine
+from simsnn.core.nodes import LIF, InputTrain, RandomSpiker, StimulusPopulation
+
+# Below this number of nodes plus synapses the fixed cost of the array
+# operations of a step is larger than stepping every object
+SMALL_NETWORK = 200
+# Fraction of the nodes that may spike per step for the event engine to pay off
+SPARSE_ACTIVITY = 0.05
+# Ring buffers of more entries than this (delay x nodes) are too large to
+# clear and index every step, whatever the activity
+LARGE_RING = 10**7
+
+_decisions = {}
+
+
+def network_signature(network):
+    """Key under which engine decisions for similar networks are cached
+
+    Two networks with the same node types and counts, the same number of
+    synapses, the same longest delay, the same noise and integer properties,
+    and the same parameters, states, weights and wiring (which decide how
+    many nodes spike) get the same engine.
+    """
+    types = {}
+    for node in network.nodes:
+        name = type(node).__name__
+        types[name] = types.get(name, 0) + getattr(node, "size", 1)
+    return (
+        tuple(sorted(types.items())),
+        len(network.synapses),
+        max((s.d for s in network.synapses), default=1),
+        _is_noisy(network),
+        _is_integral(network),
+        _activity_digest(network),
+    )
+
+
+def _activity_digest(network):
+    """Digest of everything that the probe run of ``profile_network`` depends on"""
+    digest = hashlib.blake2b(digest_size=16)
+    units = {}
+    for node in network.nodes:
+        if isinstance(node, LIF):
+            p = node.params
+            values = [p.m, p.V_reset, p.V_min, p.thr, p.amplitude, p.I_e, p.noise, node.V, node.I]
+        elif isinstance(node, RandomSpiker):
+            values = [node.p, node.amplitude]
+        elif isinstance(node, InputTrain):
+            values = [node.loop, node.index] + list(node.train)
+        else:
+            values = []
+        digest.update(np.array([len(values)] + values, dtype=float).tobytes())
+        for unit in getattr(node, "neurons", [node]):
+            units[id(unit)] = len(units)
+    synapses = np.array(
+        [(units[id(s.pre)], units[id(s.post)], s.w, s.d) for s in network.synapses],
+        dtype=float,
+    )
+    digest.update(synapses.tobytes())
+    return digest.hexdigest()
+
+
+def _is_noisy(network):
+    return any(
+        isinstance(node, RandomSpiker) or (isinstance(node, LIF) and node.noise > 0)
+        for node in network.nodes
+    )
+
+
+def _is_integral(network):
+    try:
+        IntegerEngine.validate(network)
+    except (ValueError, OverflowError):
+        return False
+    return True
+
+
+def profile_network(network, probe_steps=20):
+    """Shape and activity of a network, as used to choose an engine
+
+    The activity is measured with a short run of a throwaway event engine
+    with its own random generator, so the network itself is not changed.
+    Networks with stimulus populations or node types that the array
+    engines step through their objects are not probed.
+
+    Parameters
+    ----------
+    network : Network
+        Network to inspect
+    probe_steps : int (Default: 20)
+        Number of steps of the probe run
+
+    Returns
+    -------
+    dict
+        ``nodes`` and ``synapses`` (counts), ``density`` (synapses per
+        ordered pair of nodes), ``max_delay``, ``mean_delay``, ``ring``
+        (entries of the delay ring buffer), ``noisy``, ``integral`` (the
+        integer engine can run it), ``probed``, and, when probed,
+        ``activity`` (mean fraction of the nodes that spike per step) and
+        ``deliveries`` (mean number of synapses that carry a spike per step)
+    """
+    n = sum(getattr(node, "size", 1) for node in network.nodes)
+    delays = np.array([s.d for s in network.synapses], dtype=np.int64)
+    max_delay = int(delays.max()) if delays.size else 1
+    profile = {
+        "nodes": n,
+        "synapses": int(delays.size),
+        "density": delays.size / n**2 if n else 0.0,
+        "max_delay": max_delay,
+        "mean_delay": float(delays.mean()) if delays.size else 0.0,
+        "ring": max_delay * n,
+        "noisy": _is_noisy(network),
+        "integral": _is_integral(network),
+        "probed": False,
+    }
+    stateful = any(
+        isinstance(node, StimulusPopulation)
+        or not isinstance(node, (LIF, InputTrain, RandomSpiker))
+        for node in network.nodes
+    )
+    if stateful or probe_steps <= 0 or n == 0:
+        return profile
+
+    engine = EventEngine(network, np.random.RandomState(0))
+    spikes = deliveries = 0
+    for _ in range(probe_steps):
+        engine.step()
+        spikes += np.count_nonzero(engine.out)
+        deliveries += engine.delivered.size
+    profile.update(
+        probed=True,
+        activity=float(spikes / (probe_steps * n)),
+        deliveries=float(deliveries / probe_steps),
+    )
+    return profile
+
+
+def select_engine(network, probe_steps=20, cache=True):
+    """Choose the engine that is expected to run a network fastest
+
+    - Small networks run on the object engine, as every array operation has
+      a fixed cost that is larger than stepping a few objects.
+    - Networks whose delay ring buffer has more entries than the network has
+      nodes and synapses, and in which few nodes spike per step, run on the
+      event engine, which only stores the input in flight. Very large rings
+      always do.
+    - Other networks run on the integer engine when it can simulate them
+      exactly, and on the vectorized engine otherwise.
+
+    Decisions are cached per ``network_signature``, so the probe run is
+    done once for every network; a network with other parameters or
+    weights is probed again.
+
+    Parameters
+    ----------
+    network : Network
+        Network to run
+    probe_steps : int (Default: 20)
+        Number of steps of the probe run, see ``profile_network``
+    cache : bool (Default: True)
+        If true, a cached decision is reused and a new one is cached
+
+    Returns
+    -------
+    dict
+        ``engine`` (the name of the chosen engine), ``reasons`` (list of
+        sentences), ``profile`` (see ``profile_network``) and ``cached``
+        (whether the decision was reused)
+    """
+    key = network_signature(network) if cache else None
+    if key in _decisions:
+        return dict(_decisions[key], cached=True)
+
+    profile = profile_network(network, probe_steps)
+    size = profile["nodes"] + profile["synapses"]
+    ring, reasons = profile["ring"], []
+    sparse = profile.get("activity", 1.0) <= SPARSE_ACTIVITY
+    if size < SMALL_NETWORK:
+        engine = "object"
+        reasons.append(f"{size} nodes and synapses is fewer than {SMALL_NETWORK}")
+    elif ring > LARGE_RING:
+        engine = "event"
+        reasons.append(f"a delay ring of {ring} entries is larger than {LARGE_RING}")
+    elif ring > size and not profile["noisy"] and sparse and profile["probed"]:
+        engine = "event"
+        reasons.append(
+            f"a delay ring of {ring} entries is larger than the network ({size}) and "
+            f"{profile['activity']:.3f} of the nodes spike per step"
+        )
+    elif profile["integral"]:
+        engine = "integer"
+        reasons.append("the network can be simulated exactly with integers")
+    else:
+        engine = "vectorized"
+        reasons.append("the network needs floating point arithmetic")
+    if profile["noisy"] and engine != "object":
+        reasons.append("noise is drawn from the simulator's random generator")
+
+    decision = {"engine": engine, "reasons": reasons, "profile": profile, "cached": False}
+    if cache:
+        _decisions[key] = decision
+    return dict(decision)
@@ -1,8 +1,15 @@
+import asyncio
+
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 import networkx as nx
 from simsnn.core.detectors import Raster, Multimeter
+from simsnn.core.engines import EnsembleEngine, create_engine
+from simsnn.core.memory import detector_memory, engine_memory, estimate_engine_memory
+from simsnn.core.optimizers import optimize_network
+from simsnn.core.rendering import render_detectors
+from simsnn.core.selection import select_engine
 
 
 class Simulator:
@@ -14,37 +21,504 @@ class Simulator:
         Network to simulate
     detectors : List
         List of detectors
+    seed : int (Default: None)
+        Seed for the random generators of the nodes and the engine
+    engine : str or class (Default: "object")
+        Engine that executes the network, see ``simsnn.core.engines``.
+        "object" steps the node objects, "vectorized" runs on arrays and
+        "integer" runs exact integer arithmetic on arrays and "event"
+        keeps the input in flight in a calendar queue, for long delays.
+        "auto" chooses one of these from the shape of the network and a
+        short probe run (see ``simsnn.core.selection.select_engine``).
+    memory_limit : int (Default: None)
+        If set, a run is refused with a ``MemoryError`` when the estimated
+        memory of the network, the engine and the detectors exceeds this
+        number of bytes (see ``memory_report``)
+
+    Attributes
+    ----------
+    run_metadata : dict
+        Information about the last run: ``engine`` (the name of the engine
+        that ran it), ``selection`` (the decision of ``select_engine`` when
+        the engine is "auto", otherwise None) and ``steps`` (the steps of
+        ``run``, or all steps recorded so far by ``step`` and ``run_until``)
     """
 
-    def __init__(self, network, seed=None):
+    def __init__(self, network, seed=None, engine="object", memory_limit=None):
         self.network = network
+        self.memory_limit = memory_limit
         self.multimeter = Multimeter()
         self.raster = Raster()
+        self.detectors = []
+        self.engine = engine
+        self.rng = np.random.RandomState(seed)
+        self._compiled = None
+        self._compiled_key = None
+        self._selection = None
+        self._recording = None
+        self.run_metadata = {}
         if seed != None:
             self.network.update_rng(np.random.RandomState(seed))
 
-    def run(self, steps, plotting=False, options=None):
+    def addDetector(self, detector):
+        """Add a detector that is recorded next to the raster and multimeter
+
+        Parameters
+        ----------
+        detector : object
+            Detector with ``bind``, ``initialize`` and ``step`` methods, such
+            as ``FirstSpike``
+
+        Returns
+        -------
+        object
+            The detector
+        """
+        self.detectors.append(detector)
+        return detector
+
+    def compile(self, force=False):
+        """Compile the network for the selected engine
+
+        The compiled engine is kept between runs, so that the state of the
+        network carries over, and is only rebuilt when nodes or synapses
+        were added or removed. Use ``force`` after changing the parameters
+        or state of existing node objects.
+
+        Returns
+        -------
+        engine
+            The engine instance
+        """
+        engine = self.engine_name()
+        key = (engine, self.network.version)
+        if force or self._compiled is None or self._compiled_key != key:
+            if self._compiled is not None:
+                self._compiled.sync()
+            self._compiled = create_engine(engine, self.network, self.rng)
+            self._compiled_key = key
+        return self._compiled
+
+    def engine_name(self):
+        """Name (or class) of the engine that runs the network
+
+        With ``engine="auto"`` the engine is selected when the network is
+        first run, and again after nodes or synapses were added or removed.
+        """
+        if self.engine != "auto":
+            return self.engine
+        if self._selection is None or self._selection[0] != self.network.version:
+            self._selection = (self.network.version, select_engine(self.network))
+        return self._selection[1]["engine"]
+
+    def run(self, steps, plotting=False, options=None, early_stop=True, fast_forward=False):
         """Run the simulator
 
+        The detectors start a new recording of ``steps`` steps; the state of
+        the network carries over from earlier runs. Use ``step`` or
+        ``run_until`` to continue a recording instead.
+
         Parameters
         ----------
         steps : int
             Number of steps to simulate
+        plotting : bool (Default: False)
+            If true, the detectors are plotted after the run
+        options : dict (Default: None)
+            Plotting options. If it contains a "path", the plots are written
+            to that file with ``render_detectors`` instead of being shown.
+        early_stop : bool (Default: True)
+            If true, the simulation stops as soon as the last raster target
+            spikes. Otherwise all steps are simulated.
+        fast_forward : bool (Default: False)
+            If true, stretches in which no input is in flight and no neuron
+            spikes are skipped: the engine computes the voltages at the end
+            in closed form (see ``VectorizedEngine.idle_steps``) and the
+            detectors record the skipped steps without simulating them. Only
+            array engines, and detectors with a ``skip`` method, can skip.
         """
         options = {} if options is None else options
-        self.raster.initialize(steps)
-        self.multimeter.initialize(steps)
-
-        for i in range(steps):
-            self.network.step()
-            self.raster.step()
-            self.multimeter.step()
-            raster = self.raster.get_measurements()
-            if raster[i][-1]:
-                break
+        if self.memory_limit is not None:
+            self.check_memory(steps)
+        engine = self.compile()
+        for detector in self._all_detectors():
+            detector.bind(engine)
+            detector.initialize(steps)
+        self._recording = (engine, self._detector_sizes())
+        self._record_metadata(engine, steps)
+        self._advance(engine, steps, early_stop=early_stop, fast_forward=fast_forward)
+        engine.sync()
 
         if plotting:
-            self.print_detectors(steps, options)
+            if "path" in options:
+                self.render_detectors(**options)
+            else:
+                self.print_detectors(steps, options)
+
+    def step(self, steps=1, fast_forward=False):
+        """Continue the simulation for a number of steps
+
+        Unlike ``run``, the recordings of earlier calls (of ``run`` or
+        ``step``) are kept: the detectors grow their storage geometrically
+        and return only the steps recorded so far. The state of the network
+        carries over through the compiled engine. Detectors that were added
+        since the last call record from now on; detectors without an
+        ``extend`` method start a new recording at every call.
+
+        Parameters
+        ----------
+        steps : int (Default: 1)
+            Number of steps to simulate
+        fast_forward : bool (Default: False)
+            If true, quiet stretches are skipped, see ``run``
+
+        Returns
+        -------
+        int
+            Number of steps simulated so far by ``run`` and ``step``
+        """
+        engine = self._continue(steps)
+        self._advance(engine, steps, fast_forward=fast_forward)
+        engine.sync()
+        self._record_metadata(engine, self.raster.index)
+        return self.raster.index
+
+    def run_until(self, predicate, max_steps, chunk=64, fast_forward=False):
+        """Continue the simulation until a condition holds
+
+        The recordings are continued as with ``step``. Detector storage is
+        reserved in chunks that grow with the recording, so ``max_steps``
+        is an upper bound and is not allocated up front.
+
+        Parameters
+        ----------
+        predicate : callable
+            Called with the simulator after every simulated step (and after
+            every skipped stretch); the run stops when it returns true. The
+            node objects are only updated at the end of the call, so the
+            predicate reads the detectors or the compiled engine.
+        max_steps : int
+            Largest number of steps to simulate
+        chunk : int (Default: 64)
+            Smallest number of steps reserved at once
+        fast_forward : bool (Default: False)
+            If true, quiet stretches are skipped, see ``run``
+
+        Returns
+        -------
+        int
+            Number of steps simulated in this call
+        """
+        done = 0
+        stopped = False
+        while done < max_steps and not stopped:
+            size = min(max_steps - done, max(chunk, getattr(self.raster, "index", 0)))
+            engine = self._continue(size)
+            advanced, stopped = self._advance(
+                engine, size, fast_forward=fast_forward, predicate=predicate
+            )
+            done += advanced
+        engine = self.compile()
+        engine.sync()
+        self._record_metadata(engine, getattr(self.raster, "index", 0))
+        return done
+
+    def _all_detectors(self):
+        return [self.raster, self.multimeter] + self.detectors
+
+    def _detector_sizes(self):
+        """Number of targets every detector was bound with, by detector id"""
+        sizes = {}
+        for detector in self._all_detectors():
+            targets = getattr(detector, "targets", getattr(detector, "synapses", None))
+            sizes[id(detector)] = None if targets is None else len(targets)
+        return sizes
+
+    def _continue(self, steps):
+        """Bind the detectors to the engine and make room for more steps
+
+        Detectors are bound again when the engine changed or targets were
+        added to them, so that they read the right state.
+        """
+        if self.memory_limit is not None:
+            self.check_memory(getattr(self.raster, "index", 0) + steps)
+        engine = self.compile()
+        previous, started = self._recording if self._recording is not None else (None, {})
+        sizes = self._detector_sizes()
+        for detector in self._all_detectors():
+            if id(detector) not in started:
+                detector.bind(engine)
+                detector.initialize(0)
+            elif engine is not previous or sizes[id(detector)] != started[id(detector)]:
+                detector.bind(engine)
+            extend = getattr(detector, "extend", None)
+            if extend is not None:
+                extend(steps)
+            else:
+                detector.initialize(steps)
+        self._recording = (engine, sizes)
+        return engine
+
+    def _record_metadata(self, engine, steps):
+        self.run_metadata = {
+            "engine": getattr(engine, "name", type(engine).__name__),
+            "selection": self._selection[1] if self.engine == "auto" else None,
+            "steps": steps,
+        }
+
+    def _advance(self, engine, steps, early_stop=False, fast_forward=False, predicate=None):
+        """Step the engine and the detectors
+
+        Returns
+        -------
+        advanced : int
+            Number of steps that were simulated or skipped
+        stopped : bool
+            True if the run ended early, by ``early_stop`` or ``predicate``
+        """
+        detectors = self._all_detectors()
+        fast_forward = (
+            fast_forward
+            and hasattr(engine, "idle_steps")
+            and all(hasattr(detector, "skip") for detector in detectors)
+        )
+        raster = self.raster
+        early_stop = early_stop and bool(raster.targets)
+        i = 0
+        while i < steps:
+            if fast_forward:
+                idle = engine.idle_steps()
+                idle = steps - i if idle is None else min(idle, steps - i)
+                if idle > 0:
+                    # Detectors first, as they read the state before the jump
+                    for detector in detectors:
+                        detector.skip(idle)
+                    engine.skip(idle)
+                    i += idle
+                    if predicate is not None and predicate(self):
+                        return i, True
+                    continue
+            engine.step()
+            for detector in detectors:
+                detector.step()
+            i += 1
+            if early_stop and raster.spikes[raster.index - 1, -1]:
+                return i, True
+            if predicate is not None and predicate(self):
+                return i, True
+        return i, False
+
+    def memory_report(self, steps=0):
+        """Memory used by the network and the engine, and projected for the detectors
+
+        Parameters
+        ----------
+        steps : int (Default: 0)
+            Number of steps the detectors are projected to record
+
+        Returns
+        -------
+        dict
+            ``network``: the report of ``Network.memory_report``,
+            ``engine``: bytes of the compiled engine (estimated when it has
+            not been compiled yet), ``detectors``: bytes per detector for
+            ``steps`` steps, and ``total``
+        """
+        report = {"network": self.network.memory_report()}
+        engine = self.engine_name()
+        if self._compiled is not None and self._compiled_key == (engine, self.network.version):
+            report["engine"] = engine_memory(self._compiled)
+        else:
+            report["engine"] = estimate_engine_memory(self.network, getattr(engine, "name", engine))
+        detectors = [self.raster, self.multimeter] + self.detectors
+        report["detectors"] = detector_memory(detectors, steps)
+        report["total"] = (
+            report["network"]["total"] + report["engine"] + sum(report["detectors"].values())
+        )
+        return report
+
+    def check_memory(self, steps):
+        """Raise a ``MemoryError`` if a run of ``steps`` would exceed ``memory_limit``
+
+        Returns
+        -------
+        dict
+            The ``memory_report`` for the run
+        """
+        report = self.memory_report(steps)
+        if self.memory_limit is not None and report["total"] > self.memory_limit:
+            parts = {
+                f"network {name}": size
+                for name, size in report["network"].items()
+                if name not in ("total", "by_type")
+            }
+            parts["engine"] = report["engine"]
+            parts.update(report["detectors"])
+            largest = sorted(parts.items(), key=lambda item: -item[1])[:3]
+            raise MemoryError(
+                f"A run of {steps} steps needs about {report['total']} bytes, more than the "
+                f"limit of {self.memory_limit} bytes; largest parts: "
+                + ", ".join(f"{name} ({size} bytes)" for name, size in largest)
+            )
+        return report
+
+    def optimize(self, merge=True):
+        """Remove dead neurons and merge parallel synapses before a run
+
+        Only the targets of the detectors need to be preserved. Raster
+        targets that can never spike are removed from the raster, except for
+        the last one, which decides when a run stops early. Multimeter
+        targets and the targets of added detectors are always kept.
+
+        Returns
+        -------
+        dict
+            The report of ``optimize_network``
+        """
+        detected = [t for d in self.detectors for t in getattr(d, "targets", [])]
+        protected = list(self.multimeter.targets) + detected
+        if self.raster.targets:
+            protected.append(self.raster.targets[-1])
+        report = optimize_network(
+            self.network,
+            self.raster.targets + self.multimeter.targets + detected,
+            protected=protected,
+            merge=merge,
+        )
+        removed = {id(n) for n in report["removed_nodes"]}
+        self.raster.targets = [t for t in self.raster.targets if id(t) not in removed]
+        return report
+
+    def run_ensemble(self, steps, nr_seeds, seed=None, targets=None, rasters=True):
+        """Run independent realisations of a stochastic network at once
+
+        The network is compiled into an ``EnsembleEngine``, which simulates
+        ``nr_seeds`` realisations with a batch dimension and one random
+        stream per realisation. The network objects, the detectors and the
+        compiled engine of ``run`` are not affected: stimulus populations,
+        which all realisations share, are rewound afterwards.
+
+        Parameters
+        ----------
+        steps : int
+            Number of steps to simulate
+        nr_seeds : int
+            Number of realisations
+        seed : int (Default: None)
+            Root seed; realisation k always gets the same stream
+        targets : list (Default: None)
+            Nodes to record (Default: the raster targets, or all nodes)
+        rasters : bool (Default: True)
+            If true, the spikes of every realisation are returned as well.
+            Otherwise only spike counts are kept.
+
+        Returns
+        -------
+        dict
+            ``counts``: spikes per realisation and target, shape
+            (nr_seeds, targets); ``rate_mean`` and ``rate_var``: mean and
+            variance over the realisations of the spike rate (spikes per
+            step) of every target; ``rasters``: spikes of shape
+            (nr_seeds, steps, targets), if requested
+        """
+        engine = EnsembleEngine(self.network, nr_seeds, seed)
+        if targets is None:
+            targets = self.raster.targets if self.raster.targets else engine.units
+        indices = engine.indices(targets)
+        counts = np.zeros((nr_seeds, len(targets)), dtype=np.int64)
+        if rasters:
+            spikes = np.zeros((nr_seeds, steps, len(targets)), dtype=bool)
+
+        snapshots = [(population, population.snapshot()) for _, population in engine.populations]
+        try:
+            for i in range(steps):
+                engine.step()
+                spiked = engine.out[:, indices] > 0
+                counts += spiked
+                if rasters:
+                    spikes[:, i] = spiked
+        finally:
+            for population, snapshot in snapshots:
+                population.restore(snapshot)
+
+        rates = counts / steps if steps else counts.astype(float)
+        results = {
+            "counts": counts,
+            "rate_mean": rates.mean(axis=0),
+            "rate_var": rates.var(axis=0, ddof=1) if nr_seeds > 1 else np.zeros(len(targets)),
+        }
+        if rasters:
+            results["rasters"] = spikes
+        return results
+
+    async def stream(self, steps, targets=None, maxsize=16, yield_every=1):
+        """Simulate the network while streaming the spikes of every step
+
+        The network is advanced by a background task that pushes one event
+        per step into a bounded queue. When the consumer falls behind, the
+        producer blocks on the full queue, so at most ``maxsize`` steps are
+        held in memory at any time. Nothing is recorded in the detectors.
+
+        Parameters
+        ----------
+        steps : int
+            Number of steps to simulate
+        targets : list (Default: None)
+            Nodes whose spikes are streamed. Defaults to the raster targets,
+            or to all nodes of the network if the raster has no targets.
+        maxsize : int (Default: 16)
+            Maximum number of steps that are buffered ahead of the consumer
+        yield_every : int (Default: 1)
+            Number of steps after which the producer hands control back to
+            the event loop, so that other simulations can make progress
+
+        Yields
+        ------
+        t : int
+            Index of the simulated step
+        spikes : np.ndarray
+            Indices (into ``targets``) of the nodes that spiked at step t
+        """
+        if maxsize < 1:
+            raise ValueError("Stream buffer size must be at least 1")
+        if yield_every < 1:
+            raise ValueError("Steps between yields to the event loop must be at least 1")
+        if targets is None:
+            targets = self.raster.targets if self.raster.targets else self.network.nodes
+        engine = self.compile()
+        indices = engine.indices(targets)
+        queue = asyncio.Queue(maxsize=maxsize)
+
+        async def produce():
+            try:
+                for t in range(steps):
+                    engine.step()
+                    if indices is None:
+                        spikes = np.flatnonzero([target.out > 0 for target in targets])
+                    else:
+                        spikes = np.flatnonzero(engine.out[indices] > 0)
+                    await queue.put((t, spikes))
+                    if (t + 1) % yield_every == 0:
+                        await asyncio.sleep(0)
+            except Exception as error:
+                await queue.put(error)
+            else:
+                await queue.put(None)
+            finally:
+                engine.sync()
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+        finally:
+            if not producer.done():
+                producer.cancel()
 
     def to_inet_string(self):
         inet_str = ""
@@ -55,6 +529,21 @@ class Simulator:
     def get_raster_data(self):
         return self.raster.get_measurements()
 
+    def render_detectors(self, path, **options):
+        """Render the detectors to an image file without an interactive backend
+
+        Large rasters, many multimeter targets and large graphs are reduced
+        before drawing, see ``simsnn.core.rendering.render_detectors`` for
+        the options. ``run(plotting=True)`` uses this method when the options
+        contain a "path".
+
+        Returns
+        -------
+        dict
+            Summary of what was drawn
+        """
+        return render_detectors(self, path, **options)
+
     def print_detectors(self, steps, options):
         rasterdata = self.raster.get_measurements()
         print("Rasterdata:")
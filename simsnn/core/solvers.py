@@ -0,0 +1,182 @@
+import networkx as nx
+import numpy as np
+
+from simsnn.core.engines import create_engine
+from simsnn.core.networks import Network
+
+
+class DelayGraph:
+    """Weighted directed graph encoded in a network, with weights as delays
+
+    Every vertex becomes a LIF neuron and every edge a synapse whose delay
+    is the weight of the edge, so a spike that starts at a source reaches a
+    vertex after exactly its weighted distance. A vertex with in-degree k
+    starts at V=k with a threshold of k+1: its first input makes it spike,
+    after which it is reset to 0 and all its other inputs together stay
+    below the threshold, so every neuron spikes at most once. Shortest
+    paths follow from the first spike times: u precedes v on a shortest
+    path when ``t_u + w(u, v) == t_v``.
+
+    Parameters
+    ----------
+    graph : nx.Graph, nx.DiGraph or iterable
+        Graph, or its edges as (u, v) or (u, v, weight) tuples. Undirected
+        graphs are used in both directions.
+    weight : str (Default: "weight")
+        Edge attribute that holds the weight in a networkx graph; edges
+        without it have weight 1
+
+    Raises
+    ------
+    ValueError
+        If a weight is not a positive integer
+    """
+
+    def __init__(self, graph, weight="weight"):
+        if isinstance(graph, nx.Graph):
+            vertices = list(graph.nodes)
+            if not graph.is_directed():
+                graph = graph.to_directed()
+            edges = list(graph.edges(data=weight, default=1))
+        else:
+            edges = [tuple(edge) if len(edge) == 3 else (*edge, 1) for edge in graph]
+            vertices = list(dict.fromkeys(v for u, w, _ in edges for v in (u, w)))
+
+        self.incoming = {v: [] for v in vertices}
+        for u, v, w in edges:
+            if isinstance(w, bool) or not float(w).is_integer() or w < 1:
+                raise ValueError(f"Weight {w} of edge ({u}, {v}) is not a positive integer")
+            self.incoming[v].append((u, int(w)))
+
+        self.network = Network()
+        self.neurons = {}
+        for v in vertices:
+            k = len(self.incoming[v])
+            self.neurons[v] = self.network.createLIF(
+                m=1, V_init=k, V_reset=0, thr=k + 1, ID=v, increment_count=False
+            )
+        for v in vertices:
+            for u, w in self.incoming[v]:
+                self.network.createSynapse(
+                    self.neurons[u], self.neurons[v], w=1, d=w, increment_count=False
+                )
+        self.vertices = vertices
+        self.times = None
+        self.source = None
+
+    def solve(self, source, targets=None, engine="event", max_time=None):
+        """Compute the weighted distances from a source
+
+        The source receives one input before the first step, so it spikes
+        at step 0 and every reachable vertex at its distance. The event
+        engine skips the steps in which no spike arrives and stops when
+        nothing is in flight; other array engines run until ``max_time``.
+
+        Parameters
+        ----------
+        source : hashable
+            Start vertex
+        targets : list (Default: None)
+            Stop as soon as these vertices are reached; by default all
+            reachable vertices are computed
+        engine : str or class (Default: "event")
+            Array engine to run the network on
+        max_time : int (Default: None)
+            Largest distance of interest; by default the sum of all weights
+
+        Returns
+        -------
+        dict
+            Distance of every vertex that was reached
+        """
+        engine = create_engine(engine, self.network)
+        if engine.indices([]) is None:
+            raise ValueError("Solving needs an engine that keeps its state in arrays")
+        if max_time is None:
+            max_time = sum(w for edges in self.incoming.values() for _, w in edges)
+        slots = engine.indices([self.neurons[v] for v in self.vertices])
+        remaining = set(engine.indices([self.neurons[v] for v in targets])) if targets else None
+
+        engine.I[slots[self.vertices.index(source)]] += 1
+        times = np.full(engine.n, -1, dtype=np.int64)
+        skip = getattr(engine, "idle_steps", None)
+        while engine.t <= max_time:
+            if skip is not None:
+                idle = skip()
+                if idle is None:
+                    break
+                if idle:
+                    engine.skip(min(idle, max_time + 1 - engine.t))
+                    continue
+            engine.step()
+            fired = np.flatnonzero(engine.out)
+            fired = fired[times[fired] < 0]
+            times[fired] = engine.t - 1
+            if remaining is not None:
+                remaining.difference_update(fired.tolist())
+                if not remaining:
+                    break
+
+        self.source = source
+        self.times = {v: int(t) for v, t in zip(self.vertices, times[slots]) if t >= 0}
+        return dict(self.times)
+
+    def predecessors(self, v):
+        """Vertices that precede v on a shortest path from the last source"""
+        t = self.times.get(v)
+        if t is None or v == self.source:
+            return []
+        found = [u for u, w in self.incoming[v] if self.times.get(u, -1) + w == t]
+        return list(dict.fromkeys(found))
+
+    def path(self, target):
+        """One shortest path from the last source to target, or None if unreachable"""
+        if target not in self.times:
+            return None
+        path = [target]
+        while path[-1] != self.source:
+            path.append(self.predecessors(path[-1])[0])
+        return path[::-1]
+
+    def all_paths(self, target):
+        """All shortest paths from the last source to target"""
+        if target not in self.times:
+            return []
+        paths = []
+        stack = [[target]]
+        while stack:
+            partial = stack.pop()
+            if partial[-1] == self.source:
+                paths.append(partial[::-1])
+                continue
+            stack.extend(partial + [u] for u in reversed(self.predecessors(partial[-1])))
+        return paths
+
+
+def shortest_paths(graph, source, targets=None, weight="weight", engine="event"):
+    """Weighted shortest paths from a source, computed with spike timing
+
+    Parameters
+    ----------
+    graph : nx.Graph, nx.DiGraph or iterable
+        Graph or edge list, see ``DelayGraph``
+    source : hashable
+        Start vertex
+    targets : list (Default: None)
+        Vertices to find paths to; by default all reachable vertices
+    weight : str (Default: "weight")
+        Edge attribute that holds the weight in a networkx graph
+    engine : str or class (Default: "event")
+        Array engine to run the network on
+
+    Returns
+    -------
+    distances : dict
+        Distance of every reached vertex
+    paths : dict
+        One shortest path (list of vertices) per reached target
+    """
+    solver = DelayGraph(graph, weight)
+    distances = solver.solve(source, targets, engine)
+    targets = targets if targets is not None else list(distances)
+    return distances, {v: solver.path(v) for v in targets if v in distances}
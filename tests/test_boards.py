@@ -0,0 +1,113 @@
+import random
+from collections import deque
+
+import pytest
+
+from board_to_graph import (
+    add_ladders,
+    add_snakes,
+    connections_to_graph,
+    get_board_template,
+    get_shortest_paths_bidirectional,
+    get_shortest_paths_from_first_spikes,
+    get_shortest_paths_from_synapse_events,
+    make_base_connections,
+)
+from simsnn.core.detectors import FirstSpike, SynapseProbe
+from simsnn.core.networks import Network
+from simsnn.core.simulators import Simulator
+
+
+def random_jumps(rng, nr_cells):
+    """Ladders and snakes on random cells, whose ends are not the start of another jump"""
+    cells = rng.sample(range(1, nr_cells), min(nr_cells - 1, 2 * (nr_cells // 10) + 2))
+    half = len(cells) // 2
+    ladder_starts = [c for c in cells[:half] if c + 1 < nr_cells]
+    ladder_ends = [rng.randrange(c + 1, nr_cells + 1) for c in ladder_starts]
+    snake_starts = cells[half:]
+    snake_ends = [rng.randrange(0, c) for c in snake_starts]
+    starts = set(ladder_starts) | set(snake_starts)
+    ladder_ends = [e if e not in starts else nr_cells for e in ladder_ends]
+    snake_ends = [e if e not in starts else 0 for e in snake_ends]
+    return ladder_starts, ladder_ends, snake_starts, snake_ends
+
+
+def bfs_paths(nr_cells, connections):
+    """The dice throws of all shortest paths, found with a breadth-first search"""
+    distance = {0: 0}
+    queue = deque([0])
+    outgoing = {}
+    for move in connections:
+        outgoing.setdefault(move[0], []).append(move)
+    while queue:
+        cell = queue.popleft()
+        for (_, post, _) in outgoing.get(cell, []):
+            if post not in distance:
+                distance[post] = distance[cell] + 1
+                queue.append(post)
+    if nr_cells not in distance:
+        return []
+    paths = []
+    stack = [(0, [])]
+    while stack:
+        cell, throws = stack.pop()
+        if cell == nr_cells:
+            paths.append(throws)
+            continue
+        for (_, post, throw) in outgoing.get(cell, []):
+            if distance.get(post) == distance[cell] + 1:
+                stack.append((post, throws + [throw]))
+    return sorted(paths)
+
+
+def all_extractors(nr_cells, nr_dice_sides, jumps, all_paths=True, engine="integer"):
+    connections = add_snakes(add_ladders(make_base_connections(nr_cells, nr_dice_sides), *jumps[:2]), *jumps[2:])
+    net = Network()
+    sim = Simulator(net, engine=engine)
+    neurons = connections_to_graph(nr_cells, nr_dice_sides, connections, net, sim, readouts=False)
+    first_spikes = sim.addDetector(FirstSpike(neurons, predecessors=True))
+    probe = sim.addDetector(SynapseProbe())
+    sim.run(nr_cells)
+    return connections, {
+        "first spike": get_shortest_paths_from_first_spikes(first_spikes, connections, all_paths)[0],
+        "synapse probe": get_shortest_paths_from_synapse_events(probe.get_measurements(), nr_cells, all_paths)[0],
+        "bidirectional": get_shortest_paths_bidirectional(
+            nr_cells, nr_dice_sides, connections, all_paths, engine=engine
+        )[0],
+        # Templates need an array engine
+        "template": get_board_template(nr_cells, nr_dice_sides, engine if engine != "object" else "integer").get_shortest_paths(
+            *jumps, all_paths=all_paths
+        )[0],
+    }
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_extractors_match_bfs(seed):
+    rng = random.Random(seed)
+    nr_cells, nr_dice_sides = rng.randrange(5, 60), rng.randrange(2, 7)
+    jumps = random_jumps(rng, nr_cells)
+    connections, found = all_extractors(nr_cells, nr_dice_sides, jumps)
+    expected = bfs_paths(nr_cells, connections)
+    for name, paths in found.items():
+        assert sorted(paths) == expected, name
+    _, first = all_extractors(nr_cells, nr_dice_sides, jumps, all_paths=False)
+    for name, paths in first.items():
+        assert paths == expected[:1] or (expected and len(paths) == 1 and paths[0] in expected), name
+
+
+@pytest.mark.parametrize("engine", ["object", "vectorized", "event"])
+def test_extractors_on_every_engine(engine):
+    jumps = ([1, 4, 8, 21, 28, 50, 71, 80], [38, 14, 20, 42, 76, 67, 92, 99],
+             [32, 36, 48, 62, 88, 95, 97], [10, 6, 26, 18, 24, 56, 78])
+    connections, found = all_extractors(100, 6, jumps, engine=engine)
+    expected = bfs_paths(100, connections)
+    assert len(expected) == 41
+    for name, paths in found.items():
+        assert sorted(paths) == expected, name
+
+
+def test_long_paths_do_not_recurse():
+    # Paths of more than 1000 throws used to exceed the recursion limit
+    _, found = all_extractors(7000, 6, ([], [], [], []), all_paths=False)
+    for name, paths in found.items():
+        assert len(paths) == 1 and len(paths[0]) == 1167 and sum(paths[0]) == 7000, name
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from simsnn.core.networks import Network
+from simsnn.core.simulators import Simulator
+
+ENGINES = ["object", "vectorized", "integer", "event"]
+
+
+def random_network(seed, integral=False):
+    """Small random network of LIF neurons, an input train and delayed synapses"""
+    rng = np.random.default_rng(seed)
+    net = Network()
+    nodes = []
+    for i in range(rng.integers(2, 8)):
+        if integral:
+            params = dict(
+                m=int(rng.choice([0, 1])),
+                I_e=int(rng.choice([0, 1, 2, -1])),
+                thr=int(rng.choice([3, 5, 40])),
+                V_init=int(rng.integers(0, 3)),
+                V_min=int(rng.choice([0, -5])),
+                V_reset=0,
+            )
+        else:
+            params = dict(
+                m=float(rng.choice([1, 0.9, 0.95, 0.5, 0])),
+                I_e=float(rng.choice([0, 0.1, 0.03, 0.07, -0.01])),
+                thr=float(rng.choice([1, 0.7, 2.5])),
+                V_init=float(rng.random()),
+                V_min=float(rng.choice([0, -1])),
+                V_reset=float(rng.choice([0, 0.2])),
+            )
+        nodes.append(net.createLIF(ID=f"n{i}", **params))
+    if rng.random() < 0.5:
+        train = [0] * int(rng.integers(1, 60))
+        train[-1] = 1
+        nodes.append(net.createInputTrain(train, loop=bool(rng.random() < 0.5), ID="t"))
+    for _ in range(rng.integers(0, 10)):
+        a, b = rng.integers(0, len(nodes), 2)
+        if hasattr(nodes[b], "thr"):
+            w = int(rng.choice([1, 2, -1])) if integral else float(rng.choice([0.3, 0.5, 1.0, -0.2]))
+            net.createSynapse(nodes[a], nodes[b], w, int(rng.integers(1, 20)))
+    return net, nodes
+
+
+def record(build, engine, fast_forward, steps=600):
+    net, nodes = build()
+    sim = Simulator(net, engine=engine)
+    sim.raster.addTarget(nodes)
+    sim.multimeter.addTarget(nodes)
+    sim.run(steps, early_stop=False, fast_forward=fast_forward)
+    return sim.raster.get_measurements().copy(), sim.multimeter.get_measurements().copy()
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_float_engines_agree(seed):
+    reference = record(lambda: random_network(seed), "object", False)
+    for engine in ("object", "vectorized", "event"):
+        off = record(lambda: random_network(seed), engine, False)
+        on = record(lambda: random_network(seed), engine, True)
+        np.testing.assert_array_equal(off[0], reference[0])
+        # Skipping must not change a single spike; leaky voltages in closed
+        # form round differently than stepping
+        np.testing.assert_array_equal(on[0], off[0])
+        np.testing.assert_allclose(on[1], off[1], rtol=0, atol=1e-12)
+        # Array engines sum the input in another order than the objects
+        np.testing.assert_allclose(off[1], reference[1], rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_integer_engine_is_exact(seed):
+    reference = record(lambda: random_network(seed, integral=True), "object", False)
+    for engine in ENGINES:
+        for fast_forward in (False, True):
+            raster, voltages = record(lambda: random_network(seed, integral=True), engine, fast_forward)
+            np.testing.assert_array_equal(raster, reference[0])
+            np.testing.assert_array_equal(voltages, reference[1])
+
+
+def test_fast_forward_keeps_float_spike_times():
+    # Stepping reaches 0.9999999999999999 where the closed form gives 1.0
+    spikes = {}
+    for engine in ("object", "vectorized", "event"):
+        for fast_forward in (False, True):
+            net = Network()
+            neuron = net.createLIF(m=1, I_e=0.1, thr=1, ID="x")
+            sim = Simulator(net, engine=engine)
+            sim.raster.addTarget(neuron)
+            sim.run(35, early_stop=False, fast_forward=fast_forward)
+            spikes[engine, fast_forward] = np.flatnonzero(sim.raster.get_measurements()[:, 0]).tolist()
+    assert all(times == [10, 21, 32] for times in spikes.values())
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from simsnn.core.networks import Network
+from simsnn.core.optimizers import optimize_network
+from simsnn.core.simulators import Simulator
+
+
+def random_network(seed):
+    """Small random network with dead neurons and parallel synapses
+
+    Parameters and weights are sums of powers of two, so merged weights add
+    up exactly and recordings can be compared bit for bit.
+    """
+    rng = np.random.default_rng(seed)
+    net = Network()
+    nodes = []
+    for i in range(rng.integers(3, 10)):
+        params = dict(
+            m=float(rng.choice([1, 0.5, 0.75, 0])),
+            I_e=float(rng.choice([0, 0, 0.125, -0.0625])),
+            thr=float(rng.choice([1, 0.75, 2.5])),
+            V_init=float(rng.choice([0, 0.25, 0.5])),
+            V_min=float(rng.choice([0, -1])),
+            V_reset=float(rng.choice([0, 0.25])),
+        )
+        nodes.append(net.createLIF(ID=f"n{i}", **params))
+    if rng.random() < 0.5:
+        train = [0] * int(rng.integers(1, 30))
+        train[-1] = 1
+        nodes.append(net.createInputTrain(train, loop=bool(rng.random() < 0.5), ID="t"))
+    for _ in range(rng.integers(0, 16)):
+        a, b = rng.integers(0, len(nodes), 2)
+        if hasattr(nodes[b], "thr"):
+            d = int(rng.integers(1, 6))
+            for _ in range(rng.integers(1, 4)):
+                net.createSynapse(nodes[a], nodes[b], float(rng.choice([0.5, 1.0, -0.25])), d)
+    targets = [node for node in nodes if rng.random() < 0.5] or nodes[-1:]
+    return net, targets
+
+
+def record(net, targets, engine, steps=300):
+    sim = Simulator(net, engine=engine)
+    sim.raster.addTarget(targets)
+    sim.multimeter.addTarget(targets)
+    sim.run(steps, early_stop=False)
+    return sim.raster.get_measurements().copy(), sim.multimeter.get_measurements().copy()
+
+
+@pytest.mark.parametrize("engine", ["object", "vectorized"])
+@pytest.mark.parametrize("seed", range(40))
+def test_optimize_keeps_targets(seed, engine):
+    raster, voltages = record(*random_network(seed), engine)
+    net, targets = random_network(seed)
+    optimize_network(net, targets)
+    nodes = {id(node) for node in net.nodes}
+    kept = [k for k, target in enumerate(targets) if id(target) in nodes]
+    removed = [k for k, target in enumerate(targets) if id(target) not in nodes]
+    # Only neurons that can never spike are removed
+    assert not raster[:, removed].any()
+    if kept:
+        optimized = record(net, [targets[k] for k in kept], engine)
+        np.testing.assert_array_equal(optimized[0], raster[:, kept])
+        np.testing.assert_array_equal(optimized[1], voltages[:, kept])
+
+
+def test_random_networks_are_optimized():
+    removed = merged = 0
+    for seed in range(40):
+        report = optimize_network(*random_network(seed))
+        removed += len(report["removed_nodes"])
+        merged += len(report["merged_synapses"])
+    assert removed and merged
+
+
+def test_protected_and_labelled_synapses_survive():
+    net = Network()
+    source = net.createInputTrain([1, 0], loop=True, ID="s")
+    target = net.createLIF(thr=1, ID="x")
+    protected = net.createLIF(thr=1, ID="p")
+    idle = net.createLIF(thr=1, ID="i")
+    plain = [net.createSynapse(source, target, 0.5, 2) for _ in range(2)]
+    labelled = [net.createSynapse(source, target, 0.5, 2, meta=("throw", k)) for k in range(2)]
+    kept = net.createSynapse(protected, target, 1.0, 1)
+    dropped = net.createSynapse(idle, target, 1.0, 1)
+    report = optimize_network(net, [target], protected=[protected])
+    assert [node.ID for node in net.nodes] == [source.ID, target.ID, protected.ID]
+    assert [node.ID for node in report["removed_nodes"]] == [idle.ID]
+    assert report["removed_synapses"] == [dropped]
+    assert report["merged_synapses"] == {plain[0].ID: [plain[1].ID]}
+    assert net.synapses == [plain[0]] + labelled + [kept]
+    assert plain[0].w == 1.0 and all(s.w == 0.5 for s in labelled)
@@ -0,0 +1,61 @@
+import pytest
+
+from simsnn.core import selection
+from simsnn.core.networks import Network
+from simsnn.core.selection import network_signature, select_engine
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(selection, "_decisions", {})
+
+
+def chain(n=150, m=1, I_e=1, d=1, w=1):
+    """A chain of n neurons, each driven by a constant current"""
+    net = Network()
+    neurons = [net.createLIF(m=m, I_e=I_e, thr=1, ID=f"n{k}") for k in range(n)]
+    for pre, post in zip(neurons, neurons[1:]):
+        net.createSynapse(pre, post, w, d)
+    return net
+
+
+@pytest.mark.parametrize(
+    "kwargs, engine",
+    [
+        (dict(n=10), "object"),
+        (dict(), "integer"),
+        (dict(m=0.5), "vectorized"),
+        (dict(I_e=0, d=20), "event"),
+        (dict(d=20), "integer"),
+        (dict(d=70000), "event"),
+    ],
+    ids=["small", "integral", "float", "sparse", "busy", "huge ring"],
+)
+def test_select_engine(kwargs, engine):
+    decision = select_engine(chain(**kwargs))
+    assert decision["engine"] == engine
+    assert decision["reasons"] and not decision["cached"]
+
+
+def test_decisions_are_cached_per_network():
+    first = select_engine(chain())
+    again = select_engine(chain())
+    assert again["cached"] and again["engine"] == first["engine"]
+    assert not select_engine(chain(), cache=False)["cached"]
+
+
+@pytest.mark.parametrize("kwargs", [dict(I_e=1), dict(w=2), dict(m=0.5)], ids=str)
+def test_activity_misses_the_cache(kwargs):
+    # The same shape, but silent
+    assert select_engine(chain(I_e=0, d=20))["engine"] == "event"
+    other = chain(**dict(dict(I_e=0, d=20), **kwargs))
+    assert network_signature(other) != network_signature(chain(I_e=0, d=20))
+    assert not select_engine(other)["cached"]
+
+
+def test_state_misses_the_cache():
+    net = chain(I_e=0, d=20)
+    select_engine(net)
+    for neuron in net.nodes:
+        neuron.V = 1
+    assert not select_engine(net)["cached"]
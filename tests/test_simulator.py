@@ -0,0 +1,226 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from board_to_graph import (
+    add_ladders,
+    add_snakes,
+    connections_to_graph,
+    get_all_shortest_paths,
+    make_base_connections,
+)
+from simsnn.core.detectors import FirstSpike, SynapseProbe
+from simsnn.core.networks import Network
+from simsnn.core.simulators import Simulator
+
+
+def stimulated_network(kind):
+    """A stochastic network driven by a stimulus population of the given kind"""
+    rng = np.random.RandomState(1)
+    dense = (rng.rand(40, 4) < 0.3).astype(np.uint8)
+    stimulus = {
+        "dense": dict(stimulus=dense),
+        "looped": dict(events=np.nonzero(dense[:15]), length=15, periods=15),
+        "chunks": dict(chunks=[dense[k : k + 10] for k in range(0, 40, 10)]),
+    }[kind]
+    net = Network()
+    population = net.createStimulusPopulation(4, **stimulus)
+    noise = net.createRandomSpiker(p=0.1, ID="noise")
+    neurons = [net.createLIF(m=0.8, thr=1.0, ID=f"n{k}") for k in range(3)]
+    for k, neuron in enumerate(neurons):
+        net.createSynapse(population[k], neuron, 0.6, 1 + k)
+        net.createSynapse(population[k + 1], neuron, 0.5, 2)
+        net.createSynapse(noise, neuron, 0.4, 1)
+    return net, list(population) + neurons
+
+
+@pytest.mark.parametrize("kind", ["dense", "looped", "chunks"])
+def test_ensemble_leaves_stimulus_populations_alone(kind):
+    rasters = []
+    for ensemble_first in (False, True):
+        net, nodes = stimulated_network(kind)
+        sim = Simulator(net, engine="vectorized", seed=5)
+        sim.raster.addTarget(nodes)
+        if ensemble_first:
+            sim.step(7)
+            sim.run_ensemble(25, 3, seed=0)
+            sim.step(43)
+        else:
+            sim.step(50)
+        rasters.append(sim.raster.get_measurements().copy())
+    assert np.array_equal(*rasters)
+
+
+def mixed_network():
+    net = Network()
+    nodes = [
+        net.createLIF(m=0.95, I_e=0.08, thr=1.0, ID="a"),
+        net.createRandomSpiker(p=0.2, amplitude=1, ID="r"),
+        net.createLIF(m=0.9, thr=0.5, ID="c"),
+        net.createInputTrain([0, 0, 1, 0, 1], loop=True, ID="t"),
+    ]
+    net.createSynapse(nodes[0], nodes[2], 0.3, 5)
+    net.createSynapse(nodes[1], nodes[2], 0.4, 3)
+    net.createSynapse(nodes[3], nodes[2], 0.6, 2)
+    return net, nodes
+
+
+def recording(engine, plan, fast_forward=False):
+    net, nodes = mixed_network()
+    sim = Simulator(net, engine=engine, seed=3)
+    sim.raster.addTarget(nodes)
+    sim.multimeter.addTarget(nodes)
+    first_spikes = sim.addDetector(FirstSpike(nodes, predecessors=True))
+    probe = sim.addDetector(SynapseProbe())
+    for kind, steps in plan:
+        if kind == "run":
+            sim.run(steps, early_stop=False, fast_forward=fast_forward)
+        else:
+            sim.step(steps, fast_forward=fast_forward)
+    base = net.synapses[0].ID
+    return (
+        sim.raster.get_measurements().copy(),
+        sim.multimeter.get_measurements().copy(),
+        first_spikes.get_measurements().copy(),
+        [(t, synapse.ID - base) for t, synapse in probe.get_measurements()],
+        sim.run_metadata["steps"],
+        [node.V for node in nodes],
+    )
+
+
+@pytest.mark.parametrize("engine", ["object", "vectorized", "event"])
+@pytest.mark.parametrize("fast_forward", [False, True])
+@pytest.mark.parametrize(
+    "plan",
+    [
+        [("step", 100)] * 3,
+        [("run", 100), ("step", 150), ("step", 50)],
+        [("step", 1)] * 300,
+        [("step", 7)] * 42 + [("step", 6)],
+    ],
+    ids=["hundreds", "run then step", "single steps", "uneven"],
+)
+def test_step_continues_run(engine, fast_forward, plan):
+    expected = recording(engine, [("run", 300)], fast_forward)
+    got = recording(engine, plan, fast_forward)
+    assert np.array_equal(expected[0], got[0])
+    assert np.allclose(expected[1], got[1])
+    assert np.array_equal(expected[2], got[2])
+    assert expected[3] == got[3]
+    assert got[4] == 300
+    assert np.allclose(expected[5], got[5])
+
+
+def test_run_starts_a_new_recording():
+    net, nodes = mixed_network()
+    sim = Simulator(net)
+    sim.raster.addTarget(nodes)
+    sim.run(10, early_stop=False)
+    sim.run(10, early_stop=False)
+    assert sim.raster.get_measurements().shape == (10, 4)
+    sim.step(5)
+    assert sim.raster.get_measurements().shape == (15, 4)
+
+
+@pytest.mark.parametrize("engine", ["object", "integer", "event"])
+def test_run_until_stops_at_the_predicate(engine):
+    jumps = ([1, 4, 8, 21, 28, 50, 71, 80], [38, 14, 20, 42, 76, 67, 92, 99],
+             [32, 36, 48, 62, 88, 95, 97], [10, 6, 26, 18, 24, 56, 78])
+    connections = add_snakes(add_ladders(make_base_connections(100, 6), *jumps[:2]), *jumps[2:])
+    simulators = []
+    for _ in range(2):
+        net = Network()
+        sim = Simulator(net, engine=engine)
+        connections_to_graph(100, 6, connections, net, sim)
+        simulators.append(sim)
+    until, reference = simulators
+    steps = until.run_until(lambda s: s.raster.spikes[s.raster.index - 1, -1], 1000)
+    reference.run(100)
+    expected = reference.raster.get_measurements()
+    assert steps == np.flatnonzero(expected[:, -1])[0] + 1
+    assert np.array_equal(until.raster.get_measurements(), expected[:steps])
+    assert get_all_shortest_paths(until, *jumps)[0] == get_all_shortest_paths(reference, *jumps)[0]
+    assert until.run_until(lambda s: False, 0) == 0
+
+
+@pytest.mark.parametrize("engine", ["object", "vectorized", "event"])
+def test_targets_added_during_a_recording(engine):
+    expected = recording(engine, [("run", 300)])
+    net, nodes = mixed_network()
+    sim = Simulator(net, engine=engine, seed=3)
+    sim.raster.addTarget(nodes[:2])
+    sim.multimeter.addTarget(nodes[:2])
+    first_spikes = sim.addDetector(FirstSpike(nodes[:2], predecessors=True))
+    sim.step(100)
+    for detector in (sim.raster, sim.multimeter, first_spikes):
+        detector.addTarget(nodes[2:])
+    sim.step(200)
+    raster, voltages = sim.raster.get_measurements(), sim.multimeter.get_measurements()
+    assert np.array_equal(raster[:, :2], expected[0][:, :2])
+    assert np.array_equal(raster[100:, 2:], expected[0][100:, 2:])
+    assert not raster[:100, 2:].any()
+    assert np.allclose(voltages[100:], expected[1][100:])
+    later = expected[0][100:, 2:]
+    times = np.where(later.any(axis=0), later.argmax(axis=0) + 100, -1)
+    assert np.array_equal(first_spikes.get_measurements(), np.concatenate([expected[2][:2], times]))
+
+
+@pytest.mark.parametrize("engine", ["object", "vectorized", "event"])
+def test_optimize_keeps_detector_targets(engine):
+    jumps = ([1, 4, 8], [38, 14, 20], [32, 36], [10, 6])
+    connections = add_snakes(add_ladders(make_base_connections(40, 6), *jumps[:2]), *jumps[2:])
+    times = []
+    for optimize in (False, True):
+        net = Network()
+        sim = Simulator(net, engine=engine)
+        neurons = connections_to_graph(40, 6, connections, net, sim, readouts=False)
+        first_spikes = sim.addDetector(FirstSpike(neurons))
+        if optimize:
+            sim.optimize()
+            assert all(neuron in net.nodes for neuron in neurons)
+        sim.run(40)
+        times.append(first_spikes.get_measurements().copy())
+    assert times[0][-1] >= 0
+    assert np.array_equal(*times)
+
+
+def test_stream_applies_backpressure():
+    maxsize, log, ahead = 3, [], []
+    expected = recording("vectorized", [("run", 60)])[0]
+
+    async def consume(name):
+        net, nodes = mixed_network()
+        sim = Simulator(net, engine="vectorized", seed=3)
+        sim.raster.addTarget(nodes)
+        engine = sim.compile()
+        raster = np.zeros_like(expected)
+        async for t, spikes in sim.stream(60, maxsize=maxsize):
+            raster[t, spikes] = True
+            log.append(name)
+            # Steps that the producer has done beyond this one
+            ahead.append(engine.t - (t + 1))
+            await asyncio.sleep(0.001)
+        return raster
+
+    async def main():
+        return await asyncio.gather(consume("a"), consume("b"))
+
+    for raster in asyncio.run(main()):
+        assert np.array_equal(raster, expected)
+    # The slow consumer keeps the queue full, and the producer waits on it
+    assert max(ahead) == maxsize
+    # Both streams advance while the other one waits
+    assert log.index("b") < len(log) - 1 - log[::-1].index("a")
+
+
+@pytest.mark.parametrize("kwargs", [dict(maxsize=0), dict(yield_every=0)])
+def test_stream_rejects_bad_sizes(kwargs):
+    net, _ = mixed_network()
+
+    async def main():
+        async for _ in Simulator(net).stream(10, **kwargs):
+            pass
+
+    with pytest.raises(ValueError, match="at least 1"):
+        asyncio.run(main())